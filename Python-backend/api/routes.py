@@ -1,13 +1,21 @@
-from fastapi import APIRouter, HTTPException, UploadFile, File
-from pydantic import BaseModel
-from typing import Dict, List, Optional
+from fastapi import APIRouter, Body, Depends, HTTPException, Query, Request, UploadFile, File
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import ORJSONResponse, Response, StreamingResponse
+from pydantic import BaseModel, ConfigDict, Field
+from typing import Any, Dict, List, Optional
 import logging
 from datetime import datetime
-import os
 import asyncio
+import orjson
+from threading import Lock
+from concurrent.futures import ThreadPoolExecutor
+from cachetools import TTLCache, cached
+from cachetools.keys import hashkey
+
+from core.settings import settings
 
 # Import services or use lightweight stubs in minimal boot
-MINIMAL_BOOT = os.getenv("MINIMAL_BOOT", "false").lower() == "true"
+MINIMAL_BOOT = settings.minimal_boot
 
 if not MINIMAL_BOOT:
     # Real services (may require heavy ML deps)
@@ -21,61 +29,20 @@ if not MINIMAL_BOOT:
     from services.enhanced_cognitive import enhanced_cognitive
 else:
     # Lightweight stubs to avoid heavy deps in minimal boot
-    class EmotionAnalysisService:
-        async def analyze_frame(self, frame: str):
-            return {"emotion": "neutral", "confidence": 0.9}
-
-        def get_emotion_trends(self, time_window: int = 5):
-            return {"trend": "stable", "time_window": time_window}
-
-    class AttentionTrackingService:
-        async def track_attention(self, frame: str):
-            return {"attention": 0.8, "confidence": 0.88}
-
-        def get_attention_trends(self, time_window: int = 10):
-            return {"trend": "improving", "time_window": time_window}
-
-    class FatigueDetectionService:
-        async def detect_fatigue(self, frame: str):
-            return {"fatigue": 0.2, "confidence": 0.9}
-
-    class AdaptiveLearningService:
-        async def adapt_content(self, user_id: str, cognitive_state: Dict, current_content: Dict):
-            return {"action": "adjust_difficulty", "new_level": cognitive_state.get("attention", 0.7)}
-
-        async def generate_learning_path(self, user_id: str, subject: str, target_competency: str):
-            return {"user_id": user_id, "subject": subject, "path": ["intro", "practice", "quiz"]}
-
-        async def recommend_next_content(self, user_id: str, performance_data: Dict):
-            return {"recommended": {"content_id": "demo-1", "type": "quiz"}}
-
-    class WellnessService:
-        async def track_wellness_metrics(self, user_id: str, metrics: Dict):
-            return {"status": "tracked", "metrics": metrics}
-
-        async def suggest_break_activities(self, user_id: str, current_state: Dict):
-            return {"suggestions": ["stretch", "hydrate", "deep_breathing"]}
-
-        async def generate_wellness_insights(self, user_id: str):
-            return {"summary": {"mood": 7.0, "stress": 3.5, "energy": 7.5}}
-
-    # Minimal stub for cognitive monitoring in MINIMAL_BOOT mode
-    class _StubCognitiveMonitor:
-        def analyze_realtime(self, payload: Dict):
-            # return a tiny plausible summary so frontend can render
-            return {
-                "summary": {
-                    "attention": {"quality": "unknown", "current": 0.5, "percent": "50%"},
-                    "engagement": {"quality": "unknown", "current": 0.5, "percent": "50%"},
-                    "cognitive_load": {"quality": "unknown", "current": 0.5, "percent": "50%"}
-                }
-            }
-
-    cognitive_monitor = _StubCognitiveMonitor()
+    from services.stubs import (
+        EmotionAnalysisService,
+        AttentionTrackingService,
+        FatigueDetectionService,
+        AdaptiveLearningService,
+        WellnessService,
+        cognitive_monitor,
+    )
 
 # Authentication removed for development: verify_token intentionally not used
 from database.connection import get_db
 from database.logger import log_emotion, log_attention, log_generic
+from core.batching import MicroBatcher
+from core.clock import iso_now
 
 logger = logging.getLogger(__name__)
 
@@ -86,224 +53,309 @@ learning_router = APIRouter()
 wellness_router = APIRouter()
 analytics_router = APIRouter()
 
-# Service singletons (persist across requests)
+# Service singletons (built once at import, shared by every request and the
+# WebSocket loop; handlers resolve them through the get_* dependencies below)
 try:
-    emotion_service = EmotionAnalysisService()
-    attention_service = AttentionTrackingService()
-    adaptive_service = AdaptiveLearningService()
-    wellness_service = WellnessService()
+    _emotion_service = EmotionAnalysisService()
+    _attention_service = AttentionTrackingService()
+    _fatigue_service = FatigueDetectionService()
+    _adaptive_service = AdaptiveLearningService()
+    _wellness_service = WellnessService()
 except Exception as e:
     logger.error(f"Service initialization failed: {e}")
 
+
+def get_emotion_service() -> EmotionAnalysisService:
+    return _emotion_service
+
+
+def get_attention_service() -> AttentionTrackingService:
+    return _attention_service
+
+
+def get_fatigue_service() -> FatigueDetectionService:
+    return _fatigue_service
+
+
+def get_adaptive_service() -> AdaptiveLearningService:
+    return _adaptive_service
+
+
+def get_wellness_service() -> WellnessService:
+    return _wellness_service
+
+
+# Per-frame inference requests are coalesced into batched service calls
+FRAME_BATCH_SIZE = settings.frame_batch_size
+FRAME_BATCH_WAIT = settings.frame_batch_wait_ms / 1000
+
+_emotion_batcher = MicroBatcher(
+    lambda frames: get_emotion_service().analyze_frames_batch(frames),
+    max_batch=FRAME_BATCH_SIZE,
+    max_wait=FRAME_BATCH_WAIT,
+    name="emotion",
+)
+_attention_batcher = MicroBatcher(
+    lambda frames: get_attention_service().track_attention_batch(frames),
+    max_batch=FRAME_BATCH_SIZE,
+    max_wait=FRAME_BATCH_WAIT,
+    name="attention",
+)
+
+
+def get_emotion_batcher() -> MicroBatcher:
+    return _emotion_batcher
+
+
+def get_attention_batcher() -> MicroBatcher:
+    return _attention_batcher
+
 # Pydantic models
+# Request models are read-only once validated; frozen keeps them that way
+_FROZEN = ConfigDict(frozen=True)
+
 class FrameData(BaseModel):
+    model_config = _FROZEN
+
     frame: str
     timestamp: Optional[str] = None
 
+class FrameBatch(BaseModel):
+    model_config = _FROZEN
+
+    frames: List[str] = Field(..., min_length=1, max_length=64)
+    timestamps: Optional[List[str]] = None
+
 class WellnessMetrics(BaseModel):
-    mood: Optional[Dict] = {}
-    stress: Optional[Dict] = {}
-    energy: Optional[Dict] = {}
-    sleep: Optional[Dict] = {}
-    activity: Optional[Dict] = {}
+    # Unset sections stay None and are dropped on dump; the service
+    # defaults missing sections to empty maps
+    model_config = _FROZEN
+
+    mood: Optional[Dict] = None
+    stress: Optional[Dict] = None
+    energy: Optional[Dict] = None
+    sleep: Optional[Dict] = None
+    activity: Optional[Dict] = None
 
 class LearningContent(BaseModel):
+    model_config = _FROZEN
+
     content_id: str
     difficulty_level: int
     content_type: str
     duration: int
 
 class CognitiveState(BaseModel):
+    model_config = _FROZEN
+
     attention: float
     confusion: float
     engagement: float
     fatigue: float
 
 
+class PerformanceData(BaseModel):
+    # Extra keys pass through: callers may send model tokens (num__/cat__)
+    model_config = ConfigDict(extra="allow")
+
+    score: Optional[float] = None
+    time_taken: Optional[float] = None
+    mistakes: List[Any] = Field(default_factory=list)
+    raw_features: Optional[Dict[str, Any]] = None
+
+class BreakState(BaseModel):
+    model_config = _FROZEN
+
+    stress: float = 5
+    energy: float = 5
+    fatigue: float = 30
+
+
 class RealtimeSignals(BaseModel):
     user_id: Optional[str] = None
     timestamp: Optional[str] = None
-    signals: Dict = {}
-    metadata: Optional[Dict] = {}
-
-# Emotion Analysis Routes
-@emotion_router.post("/analyze")
-async def analyze_emotion(
-    frame_data: FrameData
-):
-    """Analyze emotion from camera frame"""
+    signals: Dict = Field(default_factory=dict)
+    metadata: Optional[Dict] = None
+
+# Success envelope pieces, encoded once; ORJSONResponse's options for the data
+_ENVELOPE_HEAD = b'{"success":true,"data":'
+_ENVELOPE_USER = b',"user_id":'
+_ORJSON_OPTS = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+
+def envelope_response(data: Any, user_id: Optional[str] = None) -> Response:
+    """{"success": true, "data": ..., "user_id": ...} spliced from pre-encoded bytes"""
+    return Response(
+        _ENVELOPE_HEAD + orjson.dumps(data, option=_ORJSON_OPTS)
+        + _ENVELOPE_USER + orjson.dumps(user_id) + b"}",
+        media_type="application/json"
+    )
+
+# Frame routes share one shape: run the frame(s) through a service, persist
+# each result, wrap in the success envelope
+async def _persist_frame_result(log_fn, label: str, result: Dict):
     try:
-        # Use shared singleton service instance
-        result = await emotion_service.analyze_frame(frame_data.frame)
-
-        # Persist full payload to MongoDB
-        try:
-            await log_emotion(user_id=None, payload=result, session_id=None, source="api")
-        except Exception as e:
-            logger.error(f"Emotion result persistence failed: {e}")
-        
-        return {
-            "success": True,
-            "data": result,
-            "user_id": None
-        }
-        
+        await log_fn(user_id=None, payload=result, session_id=None, source="api")
     except Exception as e:
-        logger.error(f"Emotion analysis endpoint failed: {e}")
-        raise HTTPException(status_code=500, detail=str(e))
+        logger.error(f"{label} result persistence failed: {e}")
 
-@emotion_router.get("/trends/{user_id}")
-async def get_emotion_trends(
+async def _read_frame(request: Request) -> str:
+    """Pull `frame` out of a FrameData-shaped JSON body.
+
+    Frames are multi-MB base64 strings and `frame` is the only field read, so
+    the body is parsed with orjson directly instead of json + a Pydantic model.
+    """
+    try:
+        frame = orjson.loads(await request.body())["frame"]
+    except (orjson.JSONDecodeError, KeyError, TypeError):
+        frame = None
+    if not isinstance(frame, str):
+        raise HTTPException(status_code=422, detail="Body must be a JSON object with a string 'frame' field")
+    return frame
+
+# Keeps FrameData as the documented request body for the raw-body routes
+_FRAME_OPENAPI = {
+    "requestBody": {
+        "required": True,
+        "content": {"application/json": {"schema": FrameData.model_json_schema()}}
+    }
+}
+
+def make_frame_endpoint(router: APIRouter, path: str, batcher_getter, log_fn, label: str, name: str, doc: str):
+    """Register POST `path` taking one FrameData body and answering via a MicroBatcher"""
+    async def endpoint(
+        request: Request,
+        batcher: MicroBatcher = Depends(batcher_getter)
+    ):
+        result = await batcher.submit(await _read_frame(request))
+        await _persist_frame_result(log_fn, label, result)
+        return envelope_response(result, None)
+
+    endpoint.__name__ = name
+    endpoint.__doc__ = doc
+    router.post(path, response_model=None, openapi_extra=_FRAME_OPENAPI)(endpoint)
+    return endpoint
+
+def make_frame_batch_endpoint(router: APIRouter, path: str, service_getter, method_name: str, log_fn, label: str, name: str, doc: str):
+    """Register POST `path` taking a FrameBatch and calling `service.<method_name>(frames)`"""
+    async def endpoint(
+        batch: FrameBatch,
+        service=Depends(service_getter)
+    ):
+        results = await getattr(service, method_name)(batch.frames)
+        for result in results:
+            await _persist_frame_result(log_fn, label, result)
+        return envelope_response({"results": results}, None)
+
+    endpoint.__name__ = name
+    endpoint.__doc__ = doc
+    router.post(path, response_model=None)(endpoint)
+    return endpoint
+
+# Emotion Analysis Routes
+analyze_emotion = make_frame_endpoint(
+    emotion_router, "/analyze", get_emotion_batcher, log_emotion, "Emotion",
+    "analyze_emotion", "Analyze emotion from camera frame"
+)
+analyze_emotion_batch = make_frame_batch_endpoint(
+    emotion_router, "/analyze-batch", get_emotion_service, "analyze_frames_batch", log_emotion, "Emotion",
+    "analyze_emotion_batch", "Analyze emotions for several camera frames with one batched model call"
+)
+
+@emotion_router.get("/trends/{user_id}", response_model=None)
+def get_emotion_trends(
     user_id: str,
-    time_window: int = 5
+    time_window: int = 5,
+    emotion_service: EmotionAnalysisService = Depends(get_emotion_service)
 ):
     """Get emotion trends for user"""
-    try:
-        # Use shared singleton service instance
-        trends = emotion_service.get_emotion_trends(time_window)
-        
-        return {
-            "success": True,
-            "data": trends,
-            "user_id": user_id
-        }
-        
-    except Exception as e:
-        logger.error(f"Emotion trends endpoint failed: {e}")
-        raise HTTPException(status_code=500, detail=str(e))
+    trends = emotion_service.get_emotion_trends(time_window)
+    
+    return envelope_response(trends, user_id)
 
 # Attention Tracking Routes
-@attention_router.post("/track")
-async def track_attention(
-    frame_data: FrameData
-):
-    """Track attention from camera frame"""
-    try:
-        result = await attention_service.track_attention(frame_data.frame)
-
-        # Persist full payload to MongoDB
-        try:
-            await log_attention(user_id=None, payload=result, session_id=None, source="api")
-        except Exception as e:
-            logger.error(f"Attention result persistence failed: {e}")
-        
-        return {
-            "success": True,
-            "data": result,
-            "user_id": None
-        }
-        
-    except Exception as e:
-        logger.error(f"Attention tracking endpoint failed: {e}")
-        raise HTTPException(status_code=500, detail=str(e))
-
-@attention_router.get("/trends/{user_id}")
-async def get_attention_trends(
+track_attention = make_frame_endpoint(
+    attention_router, "/track", get_attention_batcher, log_attention, "Attention",
+    "track_attention", "Track attention from camera frame"
+)
+
+track_attention_batch = make_frame_batch_endpoint(
+    attention_router, "/track-batch", get_attention_service, "track_attention_batch", log_attention, "Attention",
+    "track_attention_batch", "Track attention for several camera frames in one request"
+)
+
+@attention_router.get("/trends/{user_id}", response_model=None)
+def get_attention_trends(
     user_id: str,
-    time_window: int = 10
+    time_window: int = 10,
+    attention_service: AttentionTrackingService = Depends(get_attention_service)
 ):
     """Get attention trends for user"""
-    try:
-        # Use shared singleton service instance
-        trends = attention_service.get_attention_trends(time_window)
-        
-        return {
-            "success": True,
-            "data": trends,
-            "user_id": user_id
-        }
-        
-    except Exception as e:
-        logger.error(f"Attention trends endpoint failed: {e}")
-        raise HTTPException(status_code=500, detail=str(e))
+    trends = attention_service.get_attention_trends(time_window)
+    
+    return envelope_response(trends, user_id)
 
 # Adaptive Learning Routes
-@learning_router.post("/adapt-content")
+@learning_router.post("/adapt-content", response_model=None)
 async def adapt_content(
-    user_id: str,
-    cognitive_state: CognitiveState,
-    current_content: LearningContent
+    user_id: str = Query(...),
+    cognitive_state: CognitiveState = Body(...),
+    current_content: LearningContent = Body(...),
+    adaptive_service: AdaptiveLearningService = Depends(get_adaptive_service)
 ):
     """Adapt learning content based on cognitive state"""
+    # Dump once; the service and the log payload share these dicts
+    state = cognitive_state.model_dump()
+    content = current_content.model_dump()
+    result = await adaptive_service.adapt_content(user_id, state, content)
+    
+    # Persist full payload
     try:
-        # Use shared singleton service instance
-        result = await adaptive_service.adapt_content(
-            user_id,
-            cognitive_state.dict(),
-            current_content.dict()
-        )
-        
-        # Persist full payload
-        try:
-            await log_generic("learning_events", user_id=user_id, payload={
-                "event": "adapt_content",
-                "input": {
-                    "cognitive_state": cognitive_state.dict(),
-                    "current_content": current_content.dict()
-                },
-                "result": result
-            })
-        except Exception as e:
-            logger.error(f"Adapt content persistence failed: {e}")
-
-        return {
-            "success": True,
-            "data": result,
-            "user_id": user_id
-        }
-        
+        await log_generic("learning_events", user_id=user_id, payload={
+            "event": "adapt_content",
+            "input": {
+                "cognitive_state": state,
+                "current_content": content
+            },
+            "result": result
+        })
     except Exception as e:
-        logger.error(f"Content adaptation endpoint failed: {e}")
-        raise HTTPException(status_code=500, detail=str(e))
+        logger.error(f"Adapt content persistence failed: {e}")
 
-@learning_router.post("/generate-path")
+    return envelope_response(result, user_id)
+
+@learning_router.post("/generate-path", response_model=None)
 async def generate_learning_path(
-    user_id: str,
-    subject: str,
-    target_competency: str
+    user_id: str = Query(...),
+    subject: str = Query(...),
+    target_competency: str = Query(...),
+    adaptive_service: AdaptiveLearningService = Depends(get_adaptive_service)
 ):
     """Generate personalized learning path"""
-    try:
-        # Use shared singleton service instance
-        result = await adaptive_service.generate_learning_path(
-            user_id, subject, target_competency
-        )
-        
-        return {
-            "success": True,
-            "data": result,
-            "user_id": user_id
-        }
-        
-    except Exception as e:
-        logger.error(f"Learning path generation endpoint failed: {e}")
-        raise HTTPException(status_code=500, detail=str(e))
+    result = await adaptive_service.generate_learning_path(
+        user_id, subject, target_competency
+    )
+    
+    return envelope_response(result, user_id)
 
-@learning_router.post("/recommend-content")
+@learning_router.post("/recommend-content", response_model=None)
 async def recommend_next_content(
-    user_id: str,
-    performance_data: Dict
+    user_id: str = Query(...),
+    performance_data: PerformanceData = Body(...),
+    adaptive_service: AdaptiveLearningService = Depends(get_adaptive_service)
 ):
     """Recommend next content based on performance"""
-    try:
-        # Use shared singleton service instance
-        result = await adaptive_service.recommend_next_content(user_id, performance_data)
-        
-        return {
-            "success": True,
-            "data": result,
-            "user_id": user_id
-        }
-        
-    except Exception as e:
-        logger.error(f"Content recommendation endpoint failed: {e}")
-        raise HTTPException(status_code=500, detail=str(e))
+    result = await adaptive_service.recommend_next_content(
+        user_id, performance_data.model_dump(exclude_unset=True)
+    )
+    
+    return envelope_response(result, user_id)
 
 
 # New unauthenticated endpoint: model-backed recommendation
-@learning_router.post("/recommend")
+@learning_router.post("/recommend", response_model=None)
 async def recommend_learning(
-    request_data: Dict
+    request_data: Dict = Body(...),
+    adaptive_service: AdaptiveLearningService = Depends(get_adaptive_service)
 ):
     """Return a recommended next content item using the trained model if available.
 
@@ -312,370 +364,413 @@ async def recommend_learning(
 
     No authentication required in development.
     """
+    user_id = request_data.get("user_id", "anonymous")
+    performance = request_data.get("performance", {})
+
+    # If caller provided model-ready tokens (num__/cat__), prefer that as
+    # the input to the model. Frontend can either send a `raw_features` map
+    # or directly supply tokenized keys matching the training pipeline.
+    raw = performance.get("raw_features") if isinstance(performance, dict) else None
+    # detect token-like keys in top-level performance (best-effort)
+    provided_keys = set(performance.keys()) if isinstance(performance, dict) else set()
+    has_token_keys = any(k.startswith('num__') or k.startswith('cat__') for k in provided_keys)
+
+    if has_token_keys:
+        perf_input = performance
+    elif isinstance(raw, dict) and raw:
+        # merge the simple summary metrics into raw features
+        merged = {**raw, "score": float(performance.get("score", 0)), "time_taken": float(performance.get("time_taken", 0)), "mistake_count": float(len(performance.get("mistakes", [])))}
+        perf_input = merged
+    else:
+        perf_input = performance
+
+    # The adaptive service will itself try the model first
+    result = await adaptive_service.recommend_next_content(user_id, perf_input)
+
+    # Persist request for analytics (best-effort)
     try:
-        user_id = request_data.get("user_id", "anonymous")
-        performance = request_data.get("performance", {})
-
-        # If caller provided model-ready tokens (num__/cat__), prefer that as
-        # the input to the model. Frontend can either send a `raw_features` map
-        # or directly supply tokenized keys matching the training pipeline.
-        raw = performance.get("raw_features") if isinstance(performance, dict) else None
-        # detect token-like keys in top-level performance (best-effort)
-        provided_keys = set(performance.keys()) if isinstance(performance, dict) else set()
-        has_token_keys = any(k.startswith('num__') or k.startswith('cat__') for k in provided_keys)
-
-        if has_token_keys:
-            perf_input = performance
-        elif isinstance(raw, dict) and raw:
-            # merge the simple summary metrics into raw features
-            merged = {**raw, "score": float(performance.get("score", 0)), "time_taken": float(performance.get("time_taken", 0)), "mistake_count": float(len(performance.get("mistakes", [])))}
-            perf_input = merged
-        else:
-            perf_input = performance
-
-        # Use shared singleton service instance which will itself try model first
-        result = await adaptive_service.recommend_next_content(user_id, perf_input)
-
-        # Persist request for analytics (best-effort)
-        try:
-            await log_generic("learning_recommendations", user_id=user_id, payload={"request": request_data, "result": result})
-        except Exception as e:
-            # Avoid truthiness tests on DB objects; log exception message
-            logger.error("Recommendation persistence failed: %s", str(e))
-
-        return {
-            "success": True,
-            "data": result,
-            "user_id": user_id
-        }
-
+        await log_generic("learning_recommendations", user_id=user_id, payload={"request": request_data, "result": result})
     except Exception as e:
-        logger.error(f"Learning recommendation endpoint failed: {e}")
-        raise HTTPException(status_code=500, detail=str(e))
+        # Avoid truthiness tests on DB objects; log exception message
+        logger.error("Recommendation persistence failed: %s", str(e))
+
+    return envelope_response(result, user_id)
 
 # Wellness Routes
-@wellness_router.post("/track-metrics")
+@wellness_router.post("/track-metrics", response_model=None)
 async def track_wellness_metrics(
-    user_id: str,
-    metrics: WellnessMetrics
+    user_id: str = Query(...),
+    metrics: WellnessMetrics = Body(...),
+    wellness_service: WellnessService = Depends(get_wellness_service)
 ):
     """Track comprehensive wellness metrics"""
-    try:
-        # Use shared singleton service instance
-        result = await wellness_service.track_wellness_metrics(
-            user_id, metrics.dict()
-        )
-        
-        return {
-            "success": True,
-            "data": result,
-            "user_id": user_id
-        }
-        
-    except Exception as e:
-        logger.error(f"Wellness tracking endpoint failed: {e}")
-        raise HTTPException(status_code=500, detail=str(e))
-
-@wellness_router.post("/suggest-break")
+    result = await wellness_service.track_wellness_metrics(
+        user_id, metrics.model_dump(exclude_none=True)
+    )
+    _invalidate_user_export(user_id)
+    
+    return envelope_response(result, user_id)
+
+@wellness_router.post("/suggest-break", response_model=None)
 async def suggest_break_activities(
-    user_id: str,
-    current_state: Dict
+    user_id: str = Query(...),
+    current_state: BreakState = Body(...),
+    wellness_service: WellnessService = Depends(get_wellness_service)
 ):
     """Suggest break activities based on current state"""
-    try:
-        # Use shared singleton service instance
-        result = await wellness_service.suggest_break_activities(user_id, current_state)
-        
-        return {
-            "success": True,
-            "data": result,
-            "user_id": user_id
-        }
-        
-    except Exception as e:
-        logger.error(f"Break suggestion endpoint failed: {e}")
-        raise HTTPException(status_code=500, detail=str(e))
+    result = await wellness_service.suggest_break_activities(
+        user_id, current_state.model_dump()
+    )
+    
+    return envelope_response(result, user_id)
 
-@wellness_router.get("/insights/{user_id}")
+@wellness_router.get("/insights/{user_id}", response_model=None)
 async def get_wellness_insights(
-    user_id: str
+    user_id: str,
+    wellness_service: WellnessService = Depends(get_wellness_service)
 ):
     """Get comprehensive wellness insights"""
-    try:
-        # Use shared singleton service instance
-        result = await wellness_service.generate_wellness_insights(user_id)
-        
-        return {
-            "success": True,
-            "data": result,
-            "user_id": user_id
-        }
-        
-    except Exception as e:
-        logger.error(f"Wellness insights endpoint failed: {e}")
-        raise HTTPException(status_code=500, detail=str(e))
+    result = await wellness_service.generate_wellness_insights(user_id)
+    
+    return envelope_response(result, user_id)
+
+# Model metadata only changes on retrain; per-user exports are re-read at
+# most once a minute. Handlers are sync (threadpool), hence the locks.
+_model_info_cache = TTLCache(maxsize=128, ttl=300)
+_model_info_lock = Lock()
+_export_cache = TTLCache(maxsize=1024, ttl=60)
+_export_lock = Lock()
+
+@cached(_model_info_cache, lock=_model_info_lock)
+def _cached_model_info() -> Dict:
+    return wellness_ml_model.get_model_info()
+
+@cached(_export_cache, lock=_export_lock)
+def _cached_user_export(user_id: str) -> Dict:
+    return wellness_ml_model.export_user_data(user_id)
+
+def _invalidate_user_export(user_id: str):
+    with _export_lock:
+        _export_cache.pop(hashkey(user_id), None)
 
 # Get ML model information
 @wellness_router.get("/ml-model-info")
-async def get_ml_model_info():
+def get_ml_model_info():
     """Get information about the wellness ML model"""
-    try:
-        model_info = wellness_ml_model.get_model_info()
+    model_info = _cached_model_info()
 
-        return {
-            "success": True,
-            "model_info": model_info,
-            "timestamp": datetime.now().isoformat()
-        }
-
-    except Exception as e:
-        logger.error(f"ML model info endpoint failed: {e}")
-        raise HTTPException(status_code=500, detail=str(e))
+    return {
+        "success": True,
+        "model_info": model_info,
+        "timestamp": iso_now()
+    }
 
 # Test endpoint for ML model info (no auth required)
 @wellness_router.get("/test-ml-model-info")
-async def test_ml_model_info():
+def test_ml_model_info():
     """Test endpoint for ML model info (no authentication required)"""
-    try:
-        model_info = wellness_ml_model.get_model_info()
-        
-        return {
-            "success": True,
-            "model_info": model_info,
-            "timestamp": datetime.now().isoformat(),
-            "note": "This is a test endpoint - no authentication required"
-        }
-        
-    except Exception as e:
-        logger.error(f"Test ML model info endpoint failed: {e}")
-        raise HTTPException(status_code=500, detail=str(e))
+    model_info = _cached_model_info()
+    
+    return {
+        "success": True,
+        "model_info": model_info,
+        "timestamp": iso_now(),
+        "note": "This is a test endpoint - no authentication required"
+    }
 
 # Test endpoint for tracking metrics (no auth required)
 @wellness_router.post("/test-track-metrics")
-async def test_track_wellness_metrics(metrics: dict):
+async def test_track_wellness_metrics(
+    metrics: dict,
+    wellness_service: WellnessService = Depends(get_wellness_service)
+):
     """Test endpoint for tracking wellness metrics (no authentication required)"""
-    try:
-        # Use a test user ID
-        test_user_id = "test_user_123"
-        
-        # Track metrics and get ML prediction
-        result = await wellness_service.track_wellness_metrics(test_user_id, metrics)
-        
-        return {
-            "success": True,
-            "user_id": test_user_id,
-            "result": result,
-            "timestamp": datetime.now().isoformat(),
-            "note": "This is a test endpoint - no authentication required"
-        }
-        
-    except Exception as e:
-        logger.error(f"Test wellness metrics tracking failed: {e}")
-        raise HTTPException(status_code=500, detail=str(e))
+    # Use a test user ID
+    test_user_id = "test_user_123"
+    
+    # Track metrics and get ML prediction
+    result = await wellness_service.track_wellness_metrics(test_user_id, metrics)
+    _invalidate_user_export(test_user_id)
+    
+    return {
+        "success": True,
+        "user_id": test_user_id,
+        "result": result,
+        "timestamp": iso_now(),
+        "note": "This is a test endpoint - no authentication required"
+    }
 
 # Wellness prediction endpoint (no auth required for development)
 @wellness_router.post("/predict")
-async def predict_wellness(
+def predict_wellness(
     request_data: Dict
 ):
     """Predict wellness score using ML model"""
-    try:
-        user_id = request_data.get("user_id", "default_user")
-        data = request_data.get("data", {})
-        
-        logger.info(f"🔮 Wellness prediction request for user {user_id}")
-        logger.info(f"📊 Input data: {data}")
-        
-        # Use the wellness ML model directly for prediction
-        prediction_result = wellness_ml_model.predict_wellness(user_id, data)
-        
-        logger.info(f"✅ Prediction result: {prediction_result}")
-        
-        return {
-            "success": True,
-            "wellness_score": prediction_result.get("wellness_score", 50),
-            "confidence": prediction_result.get("confidence", 0.8),
-            "model_type": prediction_result.get("model_type", "gradient_boosting"),
-            "feature_importance": prediction_result.get("feature_importance", {}),
-            "user_context": prediction_result.get("user_context", {}),
-            "recommendations": prediction_result.get("recommendations", []),
-            "trends": prediction_result.get("trends", {}),
-            "timestamp": datetime.now().isoformat(),
-            "user_id": user_id,
-            "input_features": list(data.keys())
-        }
-        
-    except Exception as e:
-        logger.error(f"❌ Wellness prediction failed: {e}")
-        raise HTTPException(status_code=500, detail=f"Prediction failed: {str(e)}")
+    user_id = request_data.get("user_id", "default_user")
+    data = request_data.get("data", {})
+    
+    logger.info(f"🔮 Wellness prediction request for user {user_id}")
+    logger.info(f"📊 Input data: {data}")
+    
+    # Use the wellness ML model directly for prediction
+    prediction_result = wellness_ml_model.predict_wellness(user_id, data)
+    
+    logger.info(f"✅ Prediction result: {prediction_result}")
+    
+    return {
+        "success": True,
+        "wellness_score": prediction_result.get("wellness_score", 50),
+        "confidence": prediction_result.get("confidence", 0.8),
+        "model_type": prediction_result.get("model_type", "gradient_boosting"),
+        "feature_importance": prediction_result.get("feature_importance", {}),
+        "user_context": prediction_result.get("user_context", {}),
+        "recommendations": prediction_result.get("recommendations", []),
+        "trends": prediction_result.get("trends", {}),
+        "timestamp": iso_now(),
+        "user_id": user_id,
+        "input_features": list(data.keys())
+    }
 
 # Export user wellness data
 @wellness_router.get("/export-data/{user_id}")
-async def export_user_wellness_data(
+def export_user_wellness_data(
     user_id: str
 ):
     """Export user's wellness data for analysis"""
-    try:
-        # In dev mode, allow export without auth; production should re-enable checks
-        user_data = wellness_ml_model.export_user_data(user_id)
+    # In dev mode, allow export without auth; production should re-enable checks
+    user_data = _cached_user_export(user_id)
 
-        return {
-            "success": True,
-            "user_data": user_data,
-            "timestamp": datetime.now().isoformat()
-        }
+    return {
+        "success": True,
+        "user_data": user_data,
+        "timestamp": iso_now()
+    }
 
-    except Exception as e:
-        logger.error(f"Data export endpoint failed: {e}")
-        raise HTTPException(status_code=500, detail=str(e))
+# Retraining can take minutes: it runs on one dedicated thread so it never
+# holds a request-pool thread, and back-to-back requests queue instead of racing
+_retrain_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="wellness-retrain")
 
-# Retrain ML model (admin only)
-@wellness_router.post("/retrain-model")
-async def retrain_ml_model():
-    """Retrain the wellness ML model (admin only)"""
+def _retrain_and_invalidate():
     try:
-        # In dev mode retraining is allowed without auth; production should require admin
         wellness_ml_model._retrain_model()
+    except Exception:
+        logger.exception("Wellness model retraining failed")
+    finally:
+        # Clear even on failure: a partial retrain may still have changed
+        # what model info and exports report
+        with _model_info_lock:
+            _model_info_cache.clear()
+        with _export_lock:
+            _export_cache.clear()
 
-        return {
-            "success": True,
-            "message": "Model retraining initiated",
-            "timestamp": datetime.now().isoformat()
-        }
+# Retrain ML model (admin only)
+@wellness_router.post("/retrain-model")
+def retrain_ml_model():
+    """Retrain the wellness ML model (admin only)"""
+    # In dev mode retraining is allowed without auth; production should require admin
+    _retrain_executor.submit(_retrain_and_invalidate)
 
-    except Exception as e:
-        logger.error(f"Model retraining endpoint failed: {e}")
-        raise HTTPException(status_code=500, detail=str(e))
+    return {
+        "success": True,
+        "message": "Model retraining initiated",
+        "timestamp": iso_now()
+    }
 
 # Analytics Routes
-@analytics_router.get("/dashboard/{user_id}")
+# Static (mock) dashboard sections, built once and shared by every response;
+# treat as read-only
+_DASHBOARD_OVERVIEW = {
+    "total_study_time": 2847,  # minutes
+    "average_attention": 87,
+    "wellness_score": 85,
+    "learning_progress": 92,
+    "modules_completed": 12
+}
+_DASHBOARD_PERFORMANCE = {
+    "quiz_scores": [85, 92, 78, 95, 88],
+    "completion_rates": [100, 95, 100, 90, 100],
+    "time_efficiency": [90, 85, 95, 88, 92]
+}
+_DASHBOARD_WELLNESS_SUMMARY = {
+    "mood_average": 7.2,
+    "stress_average": 4.1,
+    "energy_average": 7.8,
+    "break_compliance": 85
+}
+
+async def _build_dashboard_data(
+    user_id: str,
+    emotion_service: EmotionAnalysisService,
+    attention_service: AttentionTrackingService,
+    wellness_service: WellnessService
+) -> Dict:
+    """Aggregate the analytics dashboard sections"""
+    # Query every service concurrently; one failing service degrades its
+    # section instead of failing the whole dashboard
+    sections = await asyncio.gather(
+        run_in_threadpool(emotion_service.get_emotion_trends),
+        run_in_threadpool(attention_service.get_attention_trends),
+        wellness_service.generate_wellness_insights(user_id),
+        return_exceptions=True
+    )
+    for name, section in zip(("emotion", "attention", "wellness"), sections):
+        if isinstance(section, Exception):
+            logger.error(f"Dashboard {name} section failed: {section}")
+    emotion_trends, attention_trends, wellness_insights = (
+        {"error": "unavailable"} if isinstance(section, Exception) else section
+        for section in sections
+    )
+    
+    # Mock comprehensive analytics data
+    dashboard_data = {
+        "overview": _DASHBOARD_OVERVIEW,
+        "emotion_analytics": emotion_trends,
+        "attention_analytics": attention_trends,
+        "performance_metrics": _DASHBOARD_PERFORMANCE,
+        "wellness_summary": _DASHBOARD_WELLNESS_SUMMARY,
+        "wellness_insights": wellness_insights
+    }
+    return dashboard_data
+
+@analytics_router.get("/dashboard/{user_id}", response_model=None)
 async def get_analytics_dashboard(
     user_id: str,
-    time_range: str = "week"
+    time_range: str = "week",
+    emotion_service: EmotionAnalysisService = Depends(get_emotion_service),
+    attention_service: AttentionTrackingService = Depends(get_attention_service),
+    wellness_service: WellnessService = Depends(get_wellness_service)
 ):
     """Get comprehensive analytics dashboard data"""
+    dashboard_data = await _build_dashboard_data(
+        user_id, emotion_service, attention_service, wellness_service
+    )
+    
+    # Persist dashboard generation
     try:
-        # Aggregate data from shared singleton services
-
-        # Get trends from each service
-        emotion_trends = emotion_service.get_emotion_trends()
-        attention_trends = attention_service.get_attention_trends()
-        
-        # Mock comprehensive analytics data
-        dashboard_data = {
-            "overview": {
-                "total_study_time": 2847,  # minutes
-                "average_attention": 87,
-                "wellness_score": 85,
-                "learning_progress": 92,
-                "modules_completed": 12
-            },
-            "emotion_analytics": emotion_trends,
-            "attention_analytics": attention_trends,
-            "performance_metrics": {
-                "quiz_scores": [85, 92, 78, 95, 88],
-                "completion_rates": [100, 95, 100, 90, 100],
-                "time_efficiency": [90, 85, 95, 88, 92]
-            },
-            "wellness_summary": {
-                "mood_average": 7.2,
-                "stress_average": 4.1,
-                "energy_average": 7.8,
-                "break_compliance": 85
-            }
-        }
-        
-        # Persist dashboard generation
-        try:
-            await log_generic("analytics_events", user_id=user_id, payload={
-                "event": "dashboard",
-                "time_range": time_range,
-                "result": dashboard_data
-            })
-        except Exception as e:
-            logger.error(f"Analytics dashboard persistence failed: {e}")
-
-        return {
+        await log_generic("analytics_events", user_id=user_id, payload={
+            "event": "dashboard",
+            "time_range": time_range,
+            "result": dashboard_data
+        })
+    except Exception as e:
+        logger.error(f"Analytics dashboard persistence failed: {e}")
+
+    return ORJSONResponse({
+        "success": True,
+        "data": dashboard_data,
+        "time_range": time_range,
+        "user_id": user_id,
+        "generated_at": iso_now()
+    })
+
+@analytics_router.get("/dashboard/{user_id}/stream", response_model=None)
+async def stream_analytics_dashboard(
+    user_id: str,
+    time_range: str = "week",
+    emotion_service: EmotionAnalysisService = Depends(get_emotion_service),
+    attention_service: AttentionTrackingService = Depends(get_attention_service),
+    wellness_service: WellnessService = Depends(get_wellness_service)
+):
+    """Stream the analytics dashboard as NDJSON, one line per section.
+
+    The first line carries request metadata; each following line is
+    {"type": "section", "section": <name>, "data": {...}} so clients can
+    render sections as they arrive.
+    """
+    dashboard_data = await _build_dashboard_data(
+        user_id, emotion_service, attention_service, wellness_service
+    )
+
+    # Persist dashboard generation
+    try:
+        await log_generic("analytics_events", user_id=user_id, payload={
+            "event": "dashboard_stream",
+            "time_range": time_range,
+            "result": dashboard_data
+        })
+    except Exception as e:
+        logger.error(f"Analytics dashboard persistence failed: {e}")
+
+    async def ndjson_lines():
+        yield orjson.dumps({
+            "type": "meta",
             "success": True,
-            "data": dashboard_data,
             "time_range": time_range,
             "user_id": user_id,
-            "generated_at": datetime.now().isoformat()
-        }
-        
-    except Exception as e:
-        logger.error(f"Analytics dashboard endpoint failed: {e}")
-        raise HTTPException(status_code=500, detail=str(e))
+            "generated_at": iso_now()
+        }) + b"\n"
+        for section, data in dashboard_data.items():
+            yield orjson.dumps(
+                {"type": "section", "section": section, "data": data},
+                option=orjson.OPT_SERIALIZE_NUMPY
+            ) + b"\n"
+
+    return StreamingResponse(ndjson_lines(), media_type="application/x-ndjson")
 
-@analytics_router.post("/generate-report")
+@analytics_router.post("/generate-report", response_model=None)
 async def generate_analytics_report(
-    user_id: str,
-    report_type: str,
-    time_range: str
+    user_id: str = Query(...),
+    report_type: str = Query(...),
+    time_range: str = Query(...)
 ):
     """Generate comprehensive analytics report"""
+    # One clock read so report_id, generated_at and download_url agree
+    now = datetime.now()
+    stamp = now.strftime('%Y%m%d_%H%M%S')
+
+    # Mock report generation
+    report_data = {
+        "report_id": f"report_{user_id}_{stamp}",
+        "user_id": user_id,
+        "report_type": report_type,
+        "time_range": time_range,
+        "generated_at": now.isoformat(),
+        "summary": {
+            "total_sessions": 45,
+            "average_session_duration": 42,
+            "overall_progress": 87,
+            "wellness_trend": "improving"
+        },
+        "download_url": f"/api/reports/download/{user_id}_{stamp}.{report_type}"
+    }
+    
+    # Persist report generation
     try:
-        # Mock report generation
-        report_data = {
-            "report_id": f"report_{user_id}_{datetime.now().strftime('%Y%m%d_%H%M%S')}",
-            "user_id": user_id,
+        await log_generic("analytics_events", user_id=user_id, payload={
+            "event": "generate_report",
             "report_type": report_type,
             "time_range": time_range,
-            "generated_at": datetime.now().isoformat(),
-            "summary": {
-                "total_sessions": 45,
-                "average_session_duration": 42,
-                "overall_progress": 87,
-                "wellness_trend": "improving"
-            },
-            "download_url": f"/api/reports/download/{user_id}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.{report_type}"
-        }
-        
-        # Persist report generation
-        try:
-            await log_generic("analytics_events", user_id=user_id, payload={
-                "event": "generate_report",
-                "report_type": report_type,
-                "time_range": time_range,
-                "result": report_data
-            })
-        except Exception as e:
-            logger.error(f"Analytics report persistence failed: {e}")
-
-        return {
-            "success": True,
-            "data": report_data
-        }
-        
+            "result": report_data
+        })
     except Exception as e:
-        logger.error(f"Report generation endpoint failed: {e}")
-        raise HTTPException(status_code=500, detail=str(e))
+        logger.error(f"Analytics report persistence failed: {e}")
+
+    return ORJSONResponse({
+        "success": True,
+        "data": report_data
+    })
 
 
 # Cognitive monitoring route: frontend POSTs realtime signals, gets summary
 @analytics_router.post("/monitor/analyze")
 async def analyze_cognitive_realtime(payload: RealtimeSignals):
+    user_id = payload.user_id or "anonymous"
+    signals = payload.model_dump()
+    # call the cognitive monitor (sync or async)
+    if asyncio.iscoroutinefunction(getattr(cognitive_monitor, 'analyze_realtime', None)):
+        summary = await cognitive_monitor.analyze_realtime(signals)
+    else:
+        # run sync in threadpool to avoid blocking
+        loop = asyncio.get_running_loop()
+        summary = await loop.run_in_executor(None, cognitive_monitor.analyze_realtime, signals)
+
+    # Persist the raw payload and summary for analytics (best-effort)
     try:
-        user_id = payload.user_id or "anonymous"
-        # call the cognitive monitor (sync or async)
-        if asyncio.iscoroutinefunction(getattr(cognitive_monitor, 'analyze_realtime', None)):
-            summary = await cognitive_monitor.analyze_realtime(payload.dict())
-        else:
-            # run sync in threadpool to avoid blocking
-            loop = asyncio.get_running_loop()
-            summary = await loop.run_in_executor(None, cognitive_monitor.analyze_realtime, payload.dict())
-
-        # Persist the raw payload and summary for analytics (best-effort)
-        try:
-            await log_generic("cognitive_monitor", user_id=user_id, payload={"input": payload.dict(), "summary": summary})
-        except Exception as e:
-            logger.error("Cognitive monitor persistence failed: %s", str(e))
-
-        return {"success": True, "user_id": user_id, "summary": summary}
-
+        await log_generic("cognitive_monitor", user_id=user_id, payload={"input": signals, "summary": summary})
     except Exception as e:
-        logger.error(f"Cognitive realtime analysis failed: {e}")
-        raise HTTPException(status_code=500, detail=str(e))
+        logger.error("Cognitive monitor persistence failed: %s", str(e))
+
+    return {"success": True, "user_id": user_id, "summary": summary}
 
 
 # Enhanced cognitive analysis endpoint (no auth for dev)
@@ -686,38 +781,30 @@ async def enhanced_analyze(payload: Dict):
     print(f"🚀 [API] Payload type: {type(payload)}")
     print(f"🚀 [API] Payload keys: {list(payload.keys()) if isinstance(payload, dict) else 'Not a dict'}")
 
-    try:
-        print("🔄 [API] Calling enhanced_cognitive.analyze_realtime...")
-        # The analyzer expects a dict with 'frame' key (data URL)
-        summary = await enhanced_cognitive.analyze_realtime(payload)
-
-        print("✅ [API] Enhanced analysis completed successfully!")
-        print(f"📊 [API] Summary keys: {list(summary.keys())}")
-        print(f"📊 [API] Camera enabled: {summary.get('camera_enabled', 'N/A')}")
-        print(f"📊 [API] Metrics keys: {list(summary.get('metrics', {}).keys())}")
-        print(f"📊 [API] Enhanced analysis keys: {list(summary.get('enhanced_analysis', {}).keys())}")
-
-        # Best-effort persistence
-        try:
-            print("💾 [API] Attempting to persist analysis data...")
-            await log_generic('enhanced_analysis', user_id=None, payload={'request': payload, 'summary': summary})
-            print("✅ [API] Analysis data persisted successfully!")
-        except Exception as e:
-            print(f"⚠️ [API] Persistence failed (non-critical): {e}")
-
-        response_data = {
-            'success': True,
-            'summary': summary
-        }
-
-        print("📤 [API] Sending response back to client...")
-        print(f"📤 [API] Response summary keys: {list(response_data['summary'].keys())}")
-
-        return response_data
+    print("🔄 [API] Calling enhanced_cognitive.analyze_realtime...")
+    # The analyzer expects a dict with 'frame' key (data URL)
+    summary = await enhanced_cognitive.analyze_realtime(payload)
+
+    print("✅ [API] Enhanced analysis completed successfully!")
+    print(f"📊 [API] Summary keys: {list(summary.keys())}")
+    print(f"📊 [API] Camera enabled: {summary.get('camera_enabled', 'N/A')}")
+    print(f"📊 [API] Metrics keys: {list(summary.get('metrics', {}).keys())}")
+    print(f"📊 [API] Enhanced analysis keys: {list(summary.get('enhanced_analysis', {}).keys())}")
 
+    # Best-effort persistence
+    try:
+        print("💾 [API] Attempting to persist analysis data...")
+        await log_generic('enhanced_analysis', user_id=None, payload={'request': payload, 'summary': summary})
+        print("✅ [API] Analysis data persisted successfully!")
     except Exception as e:
-        print(f"❌ [API] Enhanced analyze endpoint failed: {e}")
-        print(f"❌ [API] Error type: {type(e)}")
-        import traceback
-        print(f"❌ [API] Full traceback: {traceback.format_exc()}")
-        raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
+        print(f"⚠️ [API] Persistence failed (non-critical): {e}")
+
+    response_data = {
+        'success': True,
+        'summary': summary
+    }
+
+    print("📤 [API] Sending response back to client...")
+    print(f"📤 [API] Response summary keys: {list(response_data['summary'].keys())}")
+
+    return response_data
\ No newline at end of file
@@ -1,50 +1,44 @@
-from fastapi import FastAPI, HTTPException, WebSocket, WebSocketDisconnect
+from fastapi import FastAPI, HTTPException, Request, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import ORJSONResponse
+from fastapi.concurrency import run_in_threadpool
 # removed HTTPBearer import - authentication disabled for development
 import uvicorn
-import os
-from dotenv import load_dotenv
+import asyncio
 import logging
 from contextlib import asynccontextmanager
+from anyio import to_thread
 
-# Load environment variables early so MINIMAL_BOOT reflects .env
-load_dotenv()
+# Environment (and .env) is read once, in core.settings
+from core.settings import settings
 
-# Minimal boot flag (now respects .env)
-MINIMAL_BOOT = os.getenv("MINIMAL_BOOT", "false").lower() == "true"
+MINIMAL_BOOT = settings.minimal_boot
 
 # Conditional imports to avoid heavy deps in minimal mode
 if not MINIMAL_BOOT:
     from database.connection import init_db, get_db, close_db
-    from services.emotion_service import EmotionAnalysisService
-    from services.attention_service import AttentionTrackingService
-    from services.fatigue_service import FatigueDetectionService
-    from services.adaptive_learning_service import AdaptiveLearningService
-    from services.wellness_service import WellnessService
-    from services.wellness_ml_model import wellness_ml_model
+    from core.frames import decode_frame  # needs OpenCV
+    from services.adaptive_learning_service import get_predict_batcher
 else:
-    # Define lightweight stub services
-    class EmotionAnalysisService:
-        async def analyze_frame(self, frame: str):
-            return {"emotion": "neutral", "confidence": 0.9}
-
-    class AttentionTrackingService:
-        async def track_attention(self, frame: str):
-            return {"attention": 0.8, "confidence": 0.88}
-
-    class FatigueDetectionService:
-        async def detect_fatigue(self, frame: str):
-            return {"fatigue": 0.2, "confidence": 0.9}
-
-    class AdaptiveLearningService:
-        pass
-
-    class WellnessService:
-        pass
+    # Stub services accept the raw base64 string; skip decoding
+    def decode_frame(frame_data):
+        return frame_data
 
 from api.routes import emotion_router, attention_router, learning_router, wellness_router, analytics_router
+from api.routes import (
+    get_emotion_service,
+    get_attention_service,
+    get_fatigue_service,
+    get_adaptive_service,
+    get_wellness_service,
+    get_emotion_batcher,
+    get_attention_batcher,
+)
 from core.websocket_manager import WebSocketManager
-from database.logger import log_emotion, log_attention, log_fatigue
+from database.logger import log_frame_bundle
+from core.log_batcher import log_batcher
+from core.clock import utc_iso_now
 
 # Configure logging
 logging.basicConfig(
@@ -61,25 +55,32 @@ adaptive_learning_service = None
 wellness_service = None
 websocket_manager = WebSocketManager()
 
+# Worker threads for run_in_threadpool / sync dependencies (anyio default is 40)
+THREADPOOL_TOKENS = settings.threadpool_tokens
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Initialize and cleanup application resources"""
     global emotion_service, attention_service, fatigue_service, adaptive_learning_service, wellness_service
     
     try:
+        to_thread.current_default_thread_limiter().total_tokens = THREADPOOL_TOKENS
+        logger.info(f"🧵 Threadpool limit set to {THREADPOOL_TOKENS}")
+
         # Initialize database (skip in minimal boot)
         if not MINIMAL_BOOT:
             await init_db()
+            log_batcher.start()
             logger.info("✅ Database initialized")
         else:
             logger.info("⚙️ MINIMAL_BOOT enabled: skipping DB init")
 
-        # Initialize services
-        emotion_service = EmotionAnalysisService()
-        attention_service = AttentionTrackingService()
-        fatigue_service = FatigueDetectionService()
-        adaptive_learning_service = AdaptiveLearningService()
-        wellness_service = WellnessService()
+        # Share the service singletons built by api.routes (no second model load)
+        emotion_service = get_emotion_service()
+        attention_service = get_attention_service()
+        fatigue_service = get_fatigue_service()
+        adaptive_learning_service = get_adaptive_service()
+        wellness_service = get_wellness_service()
         
         logger.info("✅ ML services initialized")
         
@@ -91,8 +92,12 @@ async def lifespan(app: FastAPI):
     finally:
         # Cleanup
         logger.info("🔄 Shutting down application...")
+        await get_emotion_batcher().stop()
+        await get_attention_batcher().stop()
         if not MINIMAL_BOOT:
-            # Close MongoDB connection
+            await get_predict_batcher().stop()
+            # Flush queued log writes, then close MongoDB connection
+            await log_batcher.drain()
             await close_db()
 
 # Create FastAPI app
@@ -100,13 +105,13 @@ app = FastAPI(
     title="ACAWS Python Backend",
     description="AI/ML backend for Adaptive Cognitive Access & Wellness System",
     version="1.0.0",
-    lifespan=lifespan
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse
 )
 
-# CORS middleware (allow configure via env, default to common dev ports)
-cors_origins_env = os.getenv("CORS_ORIGINS", "http://localhost:3000,http://localhost:3001,http://localhost:5173")
-# Allow all origins for development
-cors_origins = ["*"]  # In production, replace with specific origins
+# CORS middleware: CORS_ORIGINS is a comma-separated list; defaults to "*"
+# for development. In production, set specific origins.
+cors_origins = settings.cors_origin_list
 
 app.add_middleware(
     CORSMiddleware,
@@ -116,13 +121,23 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Compress larger JSON (dashboard, trends); sets Vary: Accept-Encoding itself.
+# Level 4 keeps most of the size win at a fraction of level 9's CPU
+app.add_middleware(GZipMiddleware, minimum_size=512, compresslevel=4)
+
 # Security removed for development: authentication disabled
 
+# Single handler for unexpected errors so routes don't each wrap try/except;
+# details stay in the logs instead of leaking to clients
+@app.exception_handler(Exception)
+async def unhandled_exception_handler(request: Request, exc: Exception):
+    logger.exception(f"❌ {request.method} {request.url.path} failed: {exc}")
+    return ORJSONResponse({"success": False, "error": "internal"}, status_code=500)
+
 # Health check endpoint
 @app.get("/health")
 async def health_check():
     """Health check endpoint"""
-    from datetime import datetime
     import logging
     
     logger = logging.getLogger(__name__)
@@ -132,7 +147,7 @@ async def health_check():
         "status": "healthy",
         "service": "ACAWS Python Backend",
         "version": "1.0.0",
-        "timestamp": datetime.utcnow().isoformat() + "Z"
+        "timestamp": utc_iso_now()
     }
 
 # WebSocket endpoint for real-time processing
@@ -149,28 +164,20 @@ async def websocket_endpoint(websocket: WebSocket, client_id: str):
                 # Process frame data
                 frame_data = data.get("frame")
                 if frame_data:
-                    # Analyze emotions
-                    emotion_result = await emotion_service.analyze_frame(frame_data)
-                    
-                    # Track attention
-                    attention_result = await attention_service.track_attention(frame_data)
-                    
-                    # Detect fatigue
-                    fatigue_result = await fatigue_service.detect_fatigue(frame_data)
+                    # Decode once (off the loop) and hand the same image to
+                    # every service instead of each re-decoding the base64
+                    frame = await run_in_threadpool(decode_frame, frame_data)
+
+                    # Emotion, attention and fatigue are independent reads of
+                    # the same frame: run them concurrently
+                    emotion_result, attention_result, fatigue_result = await asyncio.gather(
+                        emotion_service.analyze_frame(frame),
+                        attention_service.track_attention(frame),
+                        fatigue_service.detect_fatigue(frame)
+                    )
                     
-                    # Persist all results (no auth context on WS; use session_id=client_id)
-                    try:
-                        await log_emotion(user_id=None, payload=emotion_result, session_id=client_id, source="websocket")
-                    except Exception as e:
-                        logger.error(f"WS log_emotion failed: {e}")
-                    try:
-                        await log_attention(user_id=None, payload=attention_result, session_id=client_id, source="websocket")
-                    except Exception as e:
-                        logger.error(f"WS log_attention failed: {e}")
-                    try:
-                        await log_fatigue(user_id=None, payload=fatigue_result, session_id=client_id, source="websocket")
-                    except Exception as e:
-                        logger.error(f"WS log_fatigue failed: {e}")
+                    # Persist all results as one document (no auth context on WS; use session_id=client_id)
+                    await log_frame_bundle(client_id, emotion_result, attention_result, fatigue_result)
 
                     # Send results back
                     await websocket_manager.send_personal_message({
@@ -204,9 +211,12 @@ async def root():
     }
 
 if __name__ == "__main__":
-    port = int(os.getenv("PORT", 5000))
-    host = os.getenv("HOST", "0.0.0.0")
-    debug = os.getenv("DEBUG", "True").lower() == "true"
+    port = settings.port
+    host = settings.host
+    debug = settings.debug
+    # Each worker loads its own models and keeps its own per-user state;
+    # uvicorn ignores workers when reload is on
+    workers = settings.web_concurrency
     
     logger.info(f"🚀 Starting ACAWS Python Backend on {host}:{port}")
     
@@ -215,5 +225,12 @@ if __name__ == "__main__":
         host=host,
         port=port,
         reload=debug,
-        log_level="info"
+        log_level="info",
+        # "auto" uses uvloop when installed (not on Windows), else asyncio
+        loop="auto",
+        http="httptools",
+        # Deflate would recompress every broadcast once per connection and
+        # keeps a compressor per socket; the JSON frames are small
+        ws_per_message_deflate=settings.ws_per_message_deflate,
+        workers=None if debug else workers
     )
\ No newline at end of file
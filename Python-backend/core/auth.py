@@ -1,20 +1,61 @@
 import jwt
-import os
+import time
+import hashlib
+from cachetools import TTLCache
+from fastapi.concurrency import run_in_threadpool
 from datetime import datetime, timedelta
-from typing import Dict, Optional, List
+from typing import Dict, Optional, List, Tuple
 import logging
 
+from core.settings import settings
+
 logger = logging.getLogger(__name__)
 
-JWT_SECRET = os.getenv("JWT_SECRET", "change_this_to_a_strong_random_secret")
+JWT_SECRET = settings.jwt_secret
 JWT_ALGORITHM = "HS256"
-JWT_EXPIRE = os.getenv("JWT_EXPIRE", "7d")
+JWT_EXPIRE = settings.jwt_expire
+
+# Built once rather than per decode. No issuer is configured, so that check is
+# off; audience verification stays on so tokens minted with an `aud` for some
+# other service are still rejected.
+_JWT_ALGS = (JWT_ALGORITHM,)
+_JWT_OPTS = {"verify_signature": True, "verify_exp": True, "verify_aud": True, "verify_iss": False}
+
+# Verified tokens -> (user, expires_at). Keyed by a digest so raw tokens are
+# never held in memory. Only touched from the event loop thread, so no lock.
+TOKEN_CACHE_TTL = 60  # seconds
+_token_cache: TTLCache = TTLCache(maxsize=10_000, ttl=TOKEN_CACHE_TTL)
+
+def _token_key(token: str) -> bytes:
+    return hashlib.blake2b(token.encode(), digest_size=16).digest()
 
 async def verify_token(token: str) -> Dict:
-    """Verify JWT token and return user data"""
+    """Verify JWT token and return user data.
+
+    Results are cached for up to TOKEN_CACHE_TTL seconds (never past the
+    token's own exp). On a miss, signature verification runs in the
+    threadpool to keep the event loop free for other requests.
+    """
+    key = _token_key(token)
+    cached = _token_cache.get(key)
+    if cached is not None:
+        user, expires_at = cached
+        if expires_at > time.time():
+            return dict(user)
+        _token_cache.pop(key, None)
+
+    user, exp = await run_in_threadpool(_decode_claims, token)
+    expires_at = time.time() + TOKEN_CACHE_TTL
+    if exp is not None:
+        expires_at = min(expires_at, float(exp))
+    _token_cache[key] = (user, expires_at)
+    return dict(user)
+
+def _decode_claims(token: str) -> Tuple[Dict, Optional[float]]:
+    """Decode a JWT token, returning user data and the token's exp claim"""
     try:
         # Decode JWT token
-        payload = jwt.decode(token, JWT_SECRET, algorithms=[JWT_ALGORITHM])
+        payload = jwt.decode(token, JWT_SECRET, algorithms=_JWT_ALGS, options=_JWT_OPTS)
         
         # Handle both userId (from Express) and user_id (Python convention)
         user_id = payload.get("userId") or payload.get("user_id")
@@ -22,12 +63,13 @@ async def verify_token(token: str) -> Dict:
             raise Exception("Invalid token payload: Missing user ID")
         
         # Get user info from token or use defaults
-        return {
+        user = {
             "id": user_id,
             "email": payload.get("email", ""),
             "name": payload.get("name", "User"),
             "role": payload.get("role", "student")
         }
+        return user, payload.get("exp")
         
     except jwt.ExpiredSignatureError:
         raise Exception("Token has expired")
@@ -58,6 +100,9 @@ def create_token(user_data: Dict) -> str:
 
 def require_role(required_roles: List[str]):
     """Decorator to require specific user roles"""
+    # Built once per decorated route; membership is then a hash lookup
+    allowed_roles = frozenset(required_roles)
+
     def decorator(func):
         async def wrapper(*args, **kwargs):
             # Extract credentials from kwargs
@@ -67,9 +112,9 @@ def require_role(required_roles: List[str]):
             
             user = await verify_token(credentials.credentials)
             
-            if user["role"] not in required_roles:
+            if user["role"] not in allowed_roles:
                 raise Exception("Insufficient permissions")
             
             return await func(*args, **kwargs)
         return wrapper
-    return decorator
\ No newline at end of file
+    return decorator
@@ -0,0 +1,121 @@
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class MicroBatcher:
+    """Coalesce concurrent single-item calls into one batched call.
+
+    Callers `await submit(item)`; a background worker collects up to
+    `max_batch` items (or whatever arrives within `max_wait` seconds of the
+    first one), runs `process_batch(items)` once and resolves each caller's
+    future with its own result. `process_batch` must return one result per
+    item, in order. If a batch raises, its items are retried one at a time
+    so a single bad item only fails its own caller.
+    """
+
+    def __init__(
+        self,
+        process_batch: Callable[[List[Any]], Awaitable[List[Any]]],
+        max_batch: int = 16,
+        max_wait: float = 0.005,
+        max_queue: int = 1024,
+        name: str = "batcher",
+    ):
+        self.process_batch = process_batch
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self.max_queue = max_queue
+        self.name = name
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+
+    def _ensure_worker(self):
+        # Started lazily so the queue and task bind to the running loop
+        if self._worker is None or self._worker.done():
+            self._queue = asyncio.Queue(maxsize=self.max_queue)
+            self._worker = asyncio.create_task(self._run())
+
+    async def submit(self, item: Any) -> Any:
+        """Queue one item and wait for its result from the next batch"""
+        self._ensure_worker()
+        future = asyncio.get_running_loop().create_future()
+        # Bounded queue: producers wait here instead of growing memory
+        await self._queue.put((item, future))
+        return await future
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        queue = self._queue
+        batch = []
+        try:
+            while True:
+                batch = [await queue.get()]
+                deadline = loop.time() + self.max_wait
+                while len(batch) < self.max_batch:
+                    timeout = deadline - loop.time()
+                    if timeout <= 0:
+                        break
+                    try:
+                        batch.append(await asyncio.wait_for(queue.get(), timeout))
+                    except asyncio.TimeoutError:
+                        break
+
+                try:
+                    results = await self.process_batch([item for item, _ in batch])
+                except Exception as e:
+                    if len(batch) == 1:
+                        logger.error(f"{self.name} batch of 1 failed: {e}")
+                        self._resolve(batch[0][1], exception=e)
+                    else:
+                        logger.warning(f"{self.name} batch of {len(batch)} failed, retrying items one by one: {e}")
+                        await self._run_singly(batch)
+                    continue
+
+                for (_, future), result in zip(batch, results):
+                    self._resolve(future, result)
+        finally:
+            # Stopped mid-batch: those callers were already dequeued, fail them too
+            for _, future in batch:
+                if not future.done():
+                    future.cancel()
+
+    async def _run_singly(self, batch):
+        """Process each (item, future) on its own; failures stay per caller"""
+        for item, future in batch:
+            if future.done():
+                continue
+            try:
+                result = (await self.process_batch([item]))[0]
+            except Exception as e:
+                logger.error(f"{self.name} item failed: {e}")
+                self._resolve(future, exception=e)
+            else:
+                self._resolve(future, result)
+
+    @staticmethod
+    def _resolve(future: asyncio.Future, result: Any = None, exception: Optional[BaseException] = None):
+        # The caller may have given up (cancelled) while the batch ran
+        if future.done():
+            return
+        if exception is not None:
+            future.set_exception(exception)
+        else:
+            future.set_result(result)
+
+    async def stop(self):
+        """Cancel the worker and fail any callers still waiting"""
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
+        if self._queue is not None:
+            while not self._queue.empty():
+                _, future = self._queue.get_nowait()
+                if not future.done():
+                    future.cancel()
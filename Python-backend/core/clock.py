@@ -0,0 +1,34 @@
+import time
+
+# (epoch second, "YYYY-MM-DDTHH:MM:SS") - swapped as one tuple so threads
+# never pair a stale prefix with a new second
+_second_cache = (None, "")
+_utc_second_cache = (None, "")
+
+
+def iso_now() -> str:
+    """Local time in datetime.now().isoformat() form, cheaply.
+
+    The date/time prefix is formatted at most once per second; only the
+    microsecond suffix is built on every call.
+    """
+    global _second_cache
+    now = time.time()
+    second = int(now)
+    cached_second, prefix = _second_cache
+    if second != cached_second:
+        prefix = time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(second))
+        _second_cache = (second, prefix)
+    return f"{prefix}.{int((now - second) * 1_000_000):06d}"
+
+
+def utc_iso_now() -> str:
+    """UTC time in datetime.utcnow().isoformat() + "Z" form, same caching"""
+    global _utc_second_cache
+    now = time.time()
+    second = int(now)
+    cached_second, prefix = _utc_second_cache
+    if second != cached_second:
+        prefix = time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(second))
+        _utc_second_cache = (second, prefix)
+    return f"{prefix}.{int((now - second) * 1_000_000):06d}Z"
@@ -0,0 +1,35 @@
+import logging
+from typing import Optional, Union
+
+import cv2
+import numpy as np
+try:
+    import pybase64 as base64  # SIMD-accelerated drop-in for stdlib base64
+except ImportError:
+    import base64
+
+logger = logging.getLogger(__name__)
+
+Frame = Union[str, np.ndarray]
+
+
+def decode_frame(frame_data: Frame) -> Optional[np.ndarray]:
+    """Decode a base64 (optionally data-URL) frame to a BGR OpenCV image.
+
+    Already-decoded images are returned as-is, so a caller that fans one
+    frame out to several services can decode it once and pass the array.
+    """
+    if isinstance(frame_data, np.ndarray):
+        return frame_data
+    try:
+        # Remove data URL prefix if present
+        if ',' in frame_data:
+            frame_data = frame_data.split(',', 1)[1]
+
+        frame_bytes = base64.b64decode(frame_data, validate=False)
+        nparr = np.frombuffer(frame_bytes, np.uint8)
+        return cv2.imdecode(nparr, cv2.IMREAD_COLOR)
+
+    except Exception as e:
+        logger.error(f"Failed to decode frame: {e}")
+        return None
@@ -0,0 +1,123 @@
+import asyncio
+import logging
+from collections import defaultdict
+from typing import Any, Dict, List, Optional, Tuple
+
+from pymongo import WriteConcern
+
+from core.settings import settings
+from database.connection import get_db
+
+logger = logging.getLogger(__name__)
+
+# Queue marker telling a flush loop to write its batch and exit
+_STOP = object()
+
+
+class LogBatcher:
+    """Coalesce log inserts into one unordered insert_many per collection.
+
+    `enqueue()` is a non-blocking put onto a bounded queue; `consumers`
+    background tasks share the queue, each flushing every `max_batch`
+    documents or `max_wait` seconds, whichever comes first, so one slow
+    insert_many doesn't back the queue up. When the queue is full new
+    documents are dropped (and counted) rather than stalling the request path.
+
+    Log collections are written with their own write concern
+    (MONGODB_LOG_W, default 0: unacknowledged) so telemetry doesn't wait on
+    the primary; the client's default stays in force for everything else.
+    """
+
+    def __init__(self, max_batch: int = 500, max_wait: float = 0.05, max_queue: int = 10_000, consumers: int = 4):
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self.max_queue = max_queue
+        self.consumers = consumers
+        self.dropped = 0
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks: List[asyncio.Task] = []
+        self._write_concern = WriteConcern(w=settings.mongodb_log_w)
+        self._collections: Dict[str, Any] = {}
+
+    def start(self):
+        """Launch the flush loops on the running event loop"""
+        if not self._tasks:
+            self._queue = asyncio.Queue(maxsize=self.max_queue)
+            self._tasks = [asyncio.create_task(self._flush_loop()) for _ in range(self.consumers)]
+
+    def enqueue(self, collection: str, doc: Dict[str, Any]):
+        """Queue one document for `collection`; never blocks"""
+        if self._queue is None:
+            return
+        try:
+            self._queue.put_nowait((collection, doc))
+        except asyncio.QueueFull:
+            self.dropped += 1
+            if self.dropped % 1000 == 1:
+                logger.warning(f"⚠️ Log queue full, dropped {self.dropped} documents so far")
+
+    async def _flush_loop(self):
+        loop = asyncio.get_running_loop()
+        queue = self._queue
+        while True:
+            item = await queue.get()
+            if item is _STOP:
+                return
+            batch = [item]
+            stopping = False
+            deadline = loop.time() + self.max_wait
+            while len(batch) < self.max_batch:
+                try:
+                    item = queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    timeout = deadline - loop.time()
+                    if timeout <= 0:
+                        break
+                    try:
+                        item = await asyncio.wait_for(queue.get(), timeout)
+                    except asyncio.TimeoutError:
+                        break
+                if item is _STOP:
+                    stopping = True
+                    break
+                batch.append(item)
+            await self._write(batch)
+            if stopping:
+                return
+
+    async def _write(self, batch: List[Tuple[str, Dict[str, Any]]]):
+        db = get_db()
+        if db is None or not batch:
+            return
+        by_collection: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+        for collection, doc in batch:
+            by_collection[collection].append(doc)
+        for collection, docs in by_collection.items():
+            coll = self._collections.get(collection)
+            if coll is None or coll.database is not db:
+                coll = db.get_collection(collection, write_concern=self._write_concern)
+                self._collections[collection] = coll
+            try:
+                await coll.insert_many(docs, ordered=False)
+            except Exception as e:
+                logger.error(f"Bulk log write to {collection} ({len(docs)} docs) failed: {e}")
+
+    async def drain(self):
+        """Stop the flush loops and write whatever is still queued"""
+        if self._tasks:
+            # One stop marker per consumer, queued behind the pending documents
+            # so every batch already taken is written before the loops exit
+            for _ in self._tasks:
+                await self._queue.put(_STOP)
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+            self._tasks = []
+        if self._queue is not None:
+            pending = []
+            while not self._queue.empty():
+                pending.append(self._queue.get_nowait())
+            for i in range(0, len(pending), self.max_batch):
+                await self._write(pending[i:i + self.max_batch])
+            self._queue = None
+
+
+log_batcher = LogBatcher()
@@ -0,0 +1,72 @@
+from typing import List, Tuple
+
+from dotenv import load_dotenv
+from pydantic_settings import BaseSettings, SettingsConfigDict
+
+# Load .env before the settings read the environment
+load_dotenv()
+
+
+def _split_csv(value: str) -> Tuple[str, ...]:
+    return tuple(item.strip() for item in value.split(",") if item.strip())
+
+
+class Settings(BaseSettings):
+    """Process-wide configuration, read from the environment once at import.
+
+    Field names map to upper-case env vars (MINIMAL_BOOT, CORS_ORIGINS, ...).
+    List-valued settings are comma-separated strings, matching the existing
+    .env format; use the *_list properties for the parsed tuples.
+    """
+    # protected_namespaces: MODEL_CONFIDENCE_THRESHOLD maps to a model_* field
+    model_config = SettingsConfigDict(frozen=True, extra="ignore", protected_namespaces=("settings_",))
+
+    # Server
+    minimal_boot: bool = False
+    host: str = "0.0.0.0"
+    port: int = 5000
+    debug: bool = True
+    web_concurrency: int = 1
+    threadpool_tokens: int = 200
+    cors_origins: str = "*"
+    ws_per_message_deflate: bool = False
+
+    # Frame micro-batching
+    frame_batch_size: int = 16
+    frame_batch_wait_ms: float = 5
+
+    # Emotion analysis
+    emotion_model_path: str = "models/emotion_detection_model.h5"
+    model_confidence_threshold: float = 0.7
+    emotion_smoothing_window: int = 5
+    emotion_preproc_gamma: float = 1.0
+
+    # Attention tracking (score threshold 0-1; deviations in degrees)
+    attention_score_threshold: float = 0.7
+    attention_blink_rate_threshold: int = 20
+    attention_gaze_deviation_threshold: float = 30.0
+    attention_head_deviation_threshold: float = 20.0
+    attention_penalty_blink_weight: float = 2.0
+    attention_penalty_gaze_weight: float = 1.5
+    attention_penalty_head_weight: float = 1.2
+    attention_smoothing_alpha: float = 0.4
+
+    # Auth
+    jwt_secret: str = "change_this_to_a_strong_random_secret"
+    jwt_expire: str = "7d"
+
+    # MongoDB
+    mongodb_uri: str = ""
+    mongodb_db_name: str = "acaws"
+    mongodb_max_pool_size: int = 100
+    mongodb_min_pool_size: int = 10
+    mongodb_server_selection_timeout_ms: int = 3000
+    mongodb_compressors: str = "zstd,zlib"
+    mongodb_log_w: int = 0
+
+    @property
+    def cors_origin_list(self) -> List[str]:
+        return list(_split_csv(self.cors_origins))
+
+
+settings = Settings()
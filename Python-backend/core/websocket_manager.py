@@ -1,37 +1,80 @@
-import json
 import logging
-from typing import Dict, List
+from array import array
+from typing import Dict, List, Optional, Tuple
 from fastapi import WebSocket
 import asyncio
+import heapq
+import orjson
 
 logger = logging.getLogger(__name__)
 
+_ORJSON_OPTS = orjson.OPT_NAIVE_UTC | orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+
+
+def _encode(message: Dict) -> str:
+    # Sent as text frames: the browser client JSON.parses event.data, which
+    # would be a Blob for binary frames
+    return orjson.dumps(message, default=str, option=_ORJSON_OPTS).decode()
+
+
+# Welcome message up to the client_id value; only the id is encoded per connect
+_WELCOME_HEAD = _encode({
+    "type": "connection_established",
+    "message": "Connected to ACAWS real-time analysis",
+})[:-1] + ',"client_id":'
+
+
+# Per-client outbox: messages queued beyond this drop the oldest, and the
+# writer sends up to OUTBOX_DRAIN_MAX queued messages per wake-up
+OUTBOX_SIZE = 256
+OUTBOX_DRAIN_MAX = 32
+
+# Seconds without activity before cleanup drops a connection
+INACTIVE_AFTER = 300
+
 class WebSocketManager:
     """Manage WebSocket connections for real-time communication"""
     
     def __init__(self):
         self.active_connections: Dict[str, WebSocket] = {}
-        self.user_sessions: Dict[str, Dict] = {}
+        # Per-session stats as parallel arrays (struct-of-arrays) so stats
+        # and cleanup scans walk contiguous doubles, not a dict per session;
+        # _session_index maps client_id -> slot
+        self._session_ids: List[str] = []
+        self._connected_at = array('d')
+        self._last_activity = array('d')
+        self._message_count = array('Q')
+        self._session_index: Dict[str, int] = {}
+        # client_id -> (outgoing queue, writer task)
+        self._outboxes: Dict[str, Tuple[asyncio.Queue, asyncio.Task]] = {}
+        # (last_activity, client_id) min-heap; entries go stale when a client
+        # is active again or disconnects and are skipped when popped
+        self._activity_heap: List[Tuple[float, str]] = []
     
     async def connect(self, websocket: WebSocket, client_id: str):
         """Accept new WebSocket connection"""
         try:
             await websocket.accept()
+            # A reconnect under the same id replaces the old socket: stop its
+            # writer first so only one task ever writes per client
+            previous = self._outboxes.pop(client_id, None)
+            if previous is not None:
+                previous[1].cancel()
+                await asyncio.wait({previous[1]})
             self.active_connections[client_id] = websocket
-            self.user_sessions[client_id] = {
-                "connected_at": asyncio.get_event_loop().time(),
-                "last_activity": asyncio.get_event_loop().time(),
-                "message_count": 0
-            }
+            queue = asyncio.Queue(maxsize=OUTBOX_SIZE)
+            self._outboxes[client_id] = (
+                queue,
+                asyncio.create_task(self._writer(client_id, websocket, queue))
+            )
+            now = asyncio.get_running_loop().time()
+            self._add_session(client_id, now)
+            heapq.heappush(self._activity_heap, (now, client_id))
             
             logger.info(f"✅ WebSocket connected: {client_id}")
             
             # Send welcome message
-            await self.send_personal_message({
-                "type": "connection_established",
-                "message": "Connected to ACAWS real-time analysis",
-                "client_id": client_id
-            }, client_id)
+            self._enqueue(client_id, _WELCOME_HEAD + orjson.dumps(client_id).decode() + "}")
             
         except Exception as e:
             logger.error(f"WebSocket connection failed: {e}")
@@ -41,27 +84,107 @@ class WebSocketManager:
         try:
             if client_id in self.active_connections:
                 del self.active_connections[client_id]
+
+            outbox = self._outboxes.pop(client_id, None)
+            if outbox is not None and outbox[1] is not asyncio.current_task():
+                outbox[1].cancel()
             
-            if client_id in self.user_sessions:
-                session_duration = asyncio.get_event_loop().time() - self.user_sessions[client_id]["connected_at"]
+            connected_at = self._remove_session(client_id)
+            if connected_at is not None:
+                session_duration = asyncio.get_running_loop().time() - connected_at
                 logger.info(f"📊 WebSocket disconnected: {client_id}, Duration: {session_duration:.2f}s")
-                del self.user_sessions[client_id]
                 
         except Exception as e:
             logger.error(f"WebSocket disconnection error: {e}")
     
     async def send_personal_message(self, message: Dict, client_id: str):
-        """Send message to specific client"""
+        """Queue message for a specific client; the client's writer sends it"""
         try:
-            if client_id in self.active_connections:
-                websocket = self.active_connections[client_id]
-                await websocket.send_text(json.dumps(message))
-                
-                # Update session activity
-                if client_id in self.user_sessions:
-                    self.user_sessions[client_id]["last_activity"] = asyncio.get_event_loop().time()
-                    self.user_sessions[client_id]["message_count"] += 1
-                
+            self._enqueue(client_id, _encode(message))
+
+        except Exception as e:
+            logger.error(f"Failed to send message to {client_id}: {e}")
+
+    def _enqueue(self, client_id: str, payload: str, record_activity: bool = True):
+        """Put an encoded message on the client's outbox and record activity
+        (broadcasts don't count as activity, so idle clients still expire)"""
+        outbox = self._outboxes.get(client_id)
+        if outbox is None:
+            return
+        queue = outbox[0]
+        try:
+            queue.put_nowait(payload)
+        except asyncio.QueueFull:
+            # Slow reader: drop the oldest pending message
+            queue.get_nowait()
+            queue.put_nowait(payload)
+
+        if not record_activity:
+            return
+
+        # Update session activity
+        slot = self._session_index.get(client_id)
+        if slot is not None:
+            now = asyncio.get_running_loop().time()
+            self._last_activity[slot] = now
+            self._message_count[slot] += 1
+            self._touch(client_id, now)
+
+    def _touch(self, client_id: str, now: float):
+        """Record activity in the heap, compacting it once stale entries pile up"""
+        heap = self._activity_heap
+        heapq.heappush(heap, (now, client_id))
+        if len(heap) > 4 * len(self._session_ids) + 64:
+            self._activity_heap = list(zip(self._last_activity, self._session_ids))
+            heapq.heapify(self._activity_heap)
+
+    def _add_session(self, client_id: str, now: float):
+        slot = self._session_index.get(client_id)
+        if slot is None:
+            self._session_index[client_id] = len(self._session_ids)
+            self._session_ids.append(client_id)
+            self._connected_at.append(now)
+            self._last_activity.append(now)
+            self._message_count.append(0)
+        else:
+            # Reconnect under the same id starts a fresh session
+            self._connected_at[slot] = now
+            self._last_activity[slot] = now
+            self._message_count[slot] = 0
+
+    def _remove_session(self, client_id: str) -> Optional[float]:
+        """Drop a session by moving the last slot into its place; returns connected_at"""
+        slot = self._session_index.pop(client_id, None)
+        if slot is None:
+            return None
+        connected_at = self._connected_at[slot]
+        last = len(self._session_ids) - 1
+        if slot != last:
+            moved_id = self._session_ids[last]
+            self._session_ids[slot] = moved_id
+            self._connected_at[slot] = self._connected_at[last]
+            self._last_activity[slot] = self._last_activity[last]
+            self._message_count[slot] = self._message_count[last]
+            self._session_index[moved_id] = slot
+        self._session_ids.pop()
+        self._connected_at.pop()
+        self._last_activity.pop()
+        self._message_count.pop()
+        return connected_at
+
+    async def _writer(self, client_id: str, websocket: WebSocket, queue: asyncio.Queue):
+        """Drain one client's outbox, sending whatever has queued up per wake-up"""
+        try:
+            while True:
+                await websocket.send_text(await queue.get())
+                for _ in range(OUTBOX_DRAIN_MAX):
+                    try:
+                        payload = queue.get_nowait()
+                    except asyncio.QueueEmpty:
+                        break
+                    await websocket.send_text(payload)
+        except asyncio.CancelledError:
+            raise
         except Exception as e:
             logger.error(f"Failed to send message to {client_id}: {e}")
             # Remove broken connection
@@ -70,19 +193,14 @@ class WebSocketManager:
     async def broadcast_message(self, message: Dict):
         """Broadcast message to all connected clients"""
         try:
-            disconnected_clients = []
-            
-            for client_id, websocket in self.active_connections.items():
-                try:
-                    await websocket.send_text(json.dumps(message))
-                except Exception as e:
-                    logger.error(f"Failed to send broadcast to {client_id}: {e}")
-                    disconnected_clients.append(client_id)
-            
-            # Clean up disconnected clients
-            for client_id in disconnected_clients:
-                self.disconnect(client_id)
-                
+            # Encode once and queue on every outbox; each client's writer
+            # sends it, so one slow peer doesn't hold up the rest and no
+            # socket gets a second concurrent writer. Send failures are
+            # handled (and the client dropped) by that writer
+            payload = _encode(message)
+            for client_id in list(self._outboxes):
+                self._enqueue(client_id, payload, record_activity=False)
+
         except Exception as e:
             logger.error(f"Broadcast failed: {e}")
     
@@ -102,23 +220,25 @@ class WebSocketManager:
     def get_connection_stats(self) -> Dict:
         """Get WebSocket connection statistics"""
         try:
-            current_time = asyncio.get_event_loop().time()
+            current_time = asyncio.get_running_loop().time()
             
             stats = {
                 "total_connections": len(self.active_connections),
-                "active_sessions": len(self.user_sessions),
+                "active_sessions": len(self._session_ids),
                 "session_details": []
             }
             
-            for client_id, session in self.user_sessions.items():
-                session_duration = current_time - session["connected_at"]
-                time_since_activity = current_time - session["last_activity"]
+            for client_id, connected_at, last_activity, message_count in zip(
+                self._session_ids, self._connected_at, self._last_activity, self._message_count
+            ):
+                session_duration = current_time - connected_at
+                time_since_activity = current_time - last_activity
                 
                 stats["session_details"].append({
                     "client_id": client_id,
                     "duration": round(session_duration, 2),
                     "time_since_activity": round(time_since_activity, 2),
-                    "message_count": session["message_count"],
+                    "message_count": message_count,
                     "status": "active" if time_since_activity < 60 else "idle"
                 })
             
@@ -131,14 +251,16 @@ class WebSocketManager:
     async def cleanup_inactive_connections(self):
         """Clean up inactive WebSocket connections"""
         try:
-            current_time = asyncio.get_event_loop().time()
+            current_time = asyncio.get_running_loop().time()
+            heap = self._activity_heap
             inactive_clients = []
             
-            for client_id, session in self.user_sessions.items():
-                time_since_activity = current_time - session["last_activity"]
-                
-                # Mark as inactive if no activity for 5 minutes
-                if time_since_activity > 300:
+            # Pop only entries older than the cutoff; one is live only if it
+            # still matches the session's last activity
+            while heap and current_time - heap[0][0] > INACTIVE_AFTER:
+                last_activity, client_id = heapq.heappop(heap)
+                slot = self._session_index.get(client_id)
+                if slot is not None and self._last_activity[slot] == last_activity:
                     inactive_clients.append(client_id)
             
             for client_id in inactive_clients:
@@ -1,15 +1,23 @@
-import os
 import logging
-from dotenv import load_dotenv
 from motor.motor_asyncio import AsyncIOMotorClient
 
-load_dotenv()
+from core.settings import settings
 
 logger = logging.getLogger(__name__)
 
 # MongoDB configuration (aligns with Express backend)
-MONGODB_URI = os.getenv("MONGODB_URI")
-MONGODB_DB_NAME = os.getenv("MONGODB_DB_NAME", "acaws")
+MONGODB_URI = settings.mongodb_uri
+MONGODB_DB_NAME = settings.mongodb_db_name
+
+# One pooled client per process, shared by every handler and log_* writer.
+# Compression matters for the log-heavy write path; pymongo skips any
+# compressor whose library is not installed.
+MONGODB_CLIENT_OPTIONS = {
+    "maxPoolSize": settings.mongodb_max_pool_size,
+    "minPoolSize": settings.mongodb_min_pool_size,
+    "serverSelectionTimeoutMS": settings.mongodb_server_selection_timeout_ms,
+    "compressors": settings.mongodb_compressors,
+}
 
 # Global client/db handles
 _mongo_client: AsyncIOMotorClient | None = None
@@ -22,15 +30,21 @@ async def init_db():
         if not MONGODB_URI:
             raise ValueError("MONGODB_URI is not set in environment")
 
-        _mongo_client = AsyncIOMotorClient(MONGODB_URI)
+        _mongo_client = AsyncIOMotorClient(MONGODB_URI, **MONGODB_CLIENT_OPTIONS)
         # Ping to verify connection
         await _mongo_client.admin.command("ping")
         _mongo_db = _mongo_client[MONGODB_DB_NAME]
         logger.info(f"✅ Connected to MongoDB database: {MONGODB_DB_NAME}")
+        await _ensure_indexes(_mongo_db)
     except Exception as e:
         logger.error(f"❌ MongoDB initialization failed: {e}")
         raise
 
+async def _ensure_indexes(db):
+    """Create the indexes the log readers rely on (no-op when they exist)."""
+    # frame_logs (WebSocket frame bundles) is read per session, newest first
+    await db.frame_logs.create_index([("session_id", 1), ("timestamp", -1)])
+
 def get_db():
     """Get the MongoDB database handle."""
     return _mongo_db
@@ -1,80 +1,57 @@
 import logging
-from typing import Dict, Any, Optional
 from datetime import datetime
+from functools import partial
+from typing import Dict, Any, Optional
 
-from .connection import get_db
+from core.log_batcher import log_batcher
+
+from . import connection
 
 logger = logging.getLogger(__name__)
 
+# Writes are queued on core.log_batcher and flushed in bulk, so these return
+# without waiting on a Mongo round-trip. Timestamps the logger fills in are
+# naive-UTC datetimes, stored as BSON dates (no string formatting per event).
+# The DB check reads connection._mongo_db directly: it is on every log call
+# and init_db/close_db are the only writers
 
-async def log_emotion(user_id: Optional[str], payload: Dict[str, Any], session_id: Optional[str] = None, source: str = "api"):
-    db = get_db()
-    if not db:
-        return
-    try:
-        doc = {
-            "user_id": user_id,
-            "session_id": session_id,
-            "source": source,  # api or websocket
-            # include everything returned by the service
-            **payload,
-        }
-        if "timestamp" not in doc:
-            doc["timestamp"] = datetime.now().isoformat()
-        await db["emotion_analyses"].insert_one(doc)
-    except Exception as e:
-        logger.error(f"log_emotion failed: {e}")
 
-
-async def log_attention(user_id: Optional[str], payload: Dict[str, Any], session_id: Optional[str] = None, source: str = "api"):
-    db = get_db()
-    if not db:
+async def log_generic(collection: str, user_id: Optional[str], payload: Dict[str, Any], session_id: Optional[str] = None, source: str = "api"):
+    if connection._mongo_db is None:
         return
     try:
-        doc = {
-            "user_id": user_id,
-            "session_id": session_id,
-            "source": source,
-            **payload,
-        }
+        # Copy, not mutate: callers return the same payload to the client and
+        # the insert adds _id to whatever dict it is given. payload keys win.
+        doc = payload.copy()
+        doc.setdefault("user_id", user_id)
+        doc.setdefault("session_id", session_id)
+        doc.setdefault("source", source)  # api or websocket
         if "timestamp" not in doc:
-            doc["timestamp"] = datetime.now().isoformat()
-        await db["attention_tracking"].insert_one(doc)
+            doc["timestamp"] = datetime.utcnow()
+        log_batcher.enqueue(collection, doc)
     except Exception as e:
-        logger.error(f"log_attention failed: {e}")
+        logger.error(f"log_generic({collection}) failed: {e}")
 
 
-async def log_fatigue(user_id: Optional[str], payload: Dict[str, Any], session_id: Optional[str] = None, source: str = "api"):
-    db = get_db()
-    if not db:
-        return
-    try:
-        doc = {
-            "user_id": user_id,
-            "session_id": session_id,
-            "source": source,
-            **payload,
-        }
-        if "timestamp" not in doc:
-            doc["timestamp"] = datetime.now().isoformat()
-        await db["fatigue_detections"].insert_one(doc)
-    except Exception as e:
-        logger.error(f"log_fatigue failed: {e}")
+# Per-collection loggers: log_emotion(user_id, payload, session_id=None, source="api")
+log_emotion = partial(log_generic, "emotion_analyses")
+log_attention = partial(log_generic, "attention_tracking")
+log_fatigue = partial(log_generic, "fatigue_detections")
 
 
-async def log_generic(collection: str, user_id: Optional[str], payload: Dict[str, Any], session_id: Optional[str] = None, source: str = "api"):
-    db = get_db()
-    if not db:
+async def log_frame_bundle(session_id: Optional[str], emotion: Dict[str, Any], attention: Dict[str, Any], fatigue: Dict[str, Any], source: str = "websocket"):
+    """One document per analysed frame instead of one per service"""
+    if connection._mongo_db is None:
         return
     try:
         doc = {
-            "user_id": user_id,
             "session_id": session_id,
             "source": source,
-            **payload,
+            "timestamp": datetime.utcnow(),
+            "emotion": emotion,
+            "attention": attention,
+            "fatigue": fatigue,
         }
-        if "timestamp" not in doc:
-            doc["timestamp"] = datetime.now().isoformat()
-        await db[collection].insert_one(doc)
+        log_batcher.enqueue("frame_logs", doc)
     except Exception as e:
-        logger.error(f"log_generic failed: {e}")
+        logger.error(f"log_frame_bundle failed: {e}")
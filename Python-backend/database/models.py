@@ -1,12 +1,21 @@
-from sqlalchemy import Column, Integer, String, Float, Boolean, DateTime, Text, JSON, ForeignKey, Index
+from sqlalchemy import event, Column, Integer, BigInteger, String, Float, Boolean, DateTime, Text, ForeignKey, Index, text
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import relationship
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.orm import relationship, deferred
+from sqlalchemy.dialects.postgresql import JSONB, UUID
 import uuid
 from datetime import datetime
 
+from .partitions import PARTITIONED_TABLES, ensure_monthly_partitions
+
 Base = declarative_base()
 
+# High-insert telemetry tables (emotion/attention/fatigue, error and
+# performance logs) use BIGSERIAL keys so inserts append to the PK index
+# instead of landing on a random leaf; UUIDs stay on externally referenced
+# entities. JSON payloads are JSONB: stored parsed, compressible and
+# GIN-indexable. The same tables are range-partitioned by month on
+# created_at (see database/partitions.py), so created_at is part of their PK.
+
 class User(Base):
     __tablename__ = 'users'
     
@@ -18,7 +27,7 @@ class User(Base):
     institution = Column(String(255))
     bio = Column(Text)
     avatar = Column(String(255))
-    preferences = Column(JSON, default={})
+    preferences = Column(JSONB, default={})
     created_at = Column(DateTime, default=datetime.utcnow)
     last_login = Column(DateTime)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
@@ -43,9 +52,9 @@ class LearningModule(Base):
     category = Column(String(100), nullable=False)
     difficulty = Column(String(50), default='intermediate')
     duration = Column(Integer)  # in minutes
-    topics = Column(JSON, default=[])
-    prerequisites = Column(JSON, default=[])
-    content_data = Column(JSON, default={})
+    topics = Column(JSONB, default=[])
+    prerequisites = Column(JSONB, default=[])
+    content_data = Column(JSONB, default={})
     active = Column(Boolean, default=True)
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
@@ -73,9 +82,9 @@ class LearningSession(Base):
     status = Column(String(50), default='active')
     
     # Cognitive metrics
-    initial_cognitive_state = Column(JSON, default={})
-    current_cognitive_state = Column(JSON, default={})
-    final_cognitive_state = Column(JSON, default={})
+    initial_cognitive_state = Column(JSONB, default={})
+    current_cognitive_state = Column(JSONB, default={})
+    final_cognitive_state = Column(JSONB, default={})
     
     # Performance metrics
     attention_score = Column(Float)
@@ -87,11 +96,11 @@ class LearningSession(Base):
     # Learning metrics
     content_progress = Column(Float, default=0)
     completion_percentage = Column(Float, default=0)
-    interactions = Column(JSON, default=[])
-    adaptations_applied = Column(JSON, default={})
+    interactions = Column(JSONB, default=[])
+    adaptations_applied = Column(JSONB, default={})
     
     # Feedback
-    session_feedback = Column(JSON, default={})
+    session_feedback = Column(JSONB, default={})
     
     last_updated = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
@@ -122,8 +131,8 @@ class WellnessEntry(Base):
     
     # Additional data
     notes = Column(Text)
-    mood_tags = Column(JSON, default=[])
-    activities = Column(JSON, default=[])
+    mood_tags = Column(JSONB, default=[])
+    activities = Column(JSONB, default=[])
     
     created_at = Column(DateTime, default=datetime.utcnow)
     
@@ -139,37 +148,42 @@ class WellnessEntry(Base):
 class EmotionAnalysis(Base):
     __tablename__ = 'emotion_analyses'
     
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    id = Column(BigInteger, primary_key=True, autoincrement=True)
     user_id = Column(UUID(as_uuid=True), ForeignKey('users.id'), nullable=False)
     session_id = Column(UUID(as_uuid=True), ForeignKey('learning_sessions.id'))
     
     # Emotion data
     primary_emotion = Column(String(50))
     emotion_confidence = Column(Float)
-    emotion_probabilities = Column(JSON, default={})
+    emotion_probabilities = Column(JSONB, default={})
     emotion_intensity = Column(Float)
     
     # Face detection data
     face_detected = Column(Boolean, default=False)
-    face_coordinates = Column(JSON, default={})
+    face_coordinates = Column(JSONB, default={})
     
     # Processing metadata
     processing_time = Column(Float)  # in milliseconds
     model_version = Column(String(50))
     
-    created_at = Column(DateTime, default=datetime.utcnow)
+    created_at = Column(DateTime, primary_key=True, default=datetime.utcnow)
     
     # Indexes
+    # "latest N for a session/user" is a single range scan on these; they
+    # also cover lookups by user_id or session_id alone
     __table_args__ = (
-        Index('idx_emotion_user_id', 'user_id'),
-        Index('idx_emotion_session_id', 'session_id'),
-        Index('idx_emotion_created_at', 'created_at'),
+        Index('idx_emotion_session_created', 'session_id', 'created_at'),
+        Index('idx_emotion_user_created', 'user_id', 'created_at'),
+        Index('idx_emotion_face_detected', 'user_id', 'created_at',
+              postgresql_where=text('face_detected = true')),
+        Index('idx_emotion_probs_gin', 'emotion_probabilities', postgresql_using='gin'),
+        {'postgresql_partition_by': 'RANGE (created_at)'},
     )
 
 class AttentionTracking(Base):
     __tablename__ = 'attention_tracking'
     
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    id = Column(BigInteger, primary_key=True, autoincrement=True)
     user_id = Column(UUID(as_uuid=True), ForeignKey('users.id'), nullable=False)
     session_id = Column(UUID(as_uuid=True), ForeignKey('learning_sessions.id'))
     
@@ -181,29 +195,31 @@ class AttentionTracking(Base):
     # Eye tracking data
     blink_rate = Column(Float)
     eye_openness = Column(Float)
-    gaze_coordinates = Column(JSON, default={})
+    gaze_coordinates = Column(JSONB, default={})
     
     # Head pose data
-    head_pose = Column(JSON, default={})
+    head_pose = Column(JSONB, default={})
     facing_camera = Column(Boolean, default=True)
     
     # Processing metadata
     processing_time = Column(Float)
     confidence = Column(Float)
     
-    created_at = Column(DateTime, default=datetime.utcnow)
+    created_at = Column(DateTime, primary_key=True, default=datetime.utcnow)
     
     # Indexes
+    # "latest N for a session/user" is a single range scan on these; they
+    # also cover lookups by user_id or session_id alone
     __table_args__ = (
-        Index('idx_attention_user_id', 'user_id'),
-        Index('idx_attention_session_id', 'session_id'),
-        Index('idx_attention_created_at', 'created_at'),
+        Index('idx_attention_session_created', 'session_id', 'created_at'),
+        Index('idx_attention_user_created', 'user_id', 'created_at'),
+        {'postgresql_partition_by': 'RANGE (created_at)'},
     )
 
 class FatigueDetection(Base):
     __tablename__ = 'fatigue_detection'
     
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    id = Column(BigInteger, primary_key=True, autoincrement=True)
     user_id = Column(UUID(as_uuid=True), ForeignKey('users.id'), nullable=False)
     session_id = Column(UUID(as_uuid=True), ForeignKey('learning_sessions.id'))
     
@@ -224,13 +240,17 @@ class FatigueDetection(Base):
     processing_time = Column(Float)
     confidence = Column(Float)
     
-    created_at = Column(DateTime, default=datetime.utcnow)
+    created_at = Column(DateTime, primary_key=True, default=datetime.utcnow)
     
     # Indexes
+    # "latest N for a session/user" is a single range scan on these; they
+    # also cover lookups by user_id or session_id alone
     __table_args__ = (
-        Index('idx_fatigue_user_id', 'user_id'),
-        Index('idx_fatigue_session_id', 'session_id'),
-        Index('idx_fatigue_created_at', 'created_at'),
+        Index('idx_fatigue_session_created', 'session_id', 'created_at'),
+        Index('idx_fatigue_user_created', 'user_id', 'created_at'),
+        Index('idx_fatigue_breaks', 'user_id', 'created_at',
+              postgresql_where=text('break_recommended = true')),
+        {'postgresql_partition_by': 'RANGE (created_at)'},
     )
 
 class UserModuleProgress(Base):
@@ -244,12 +264,12 @@ class UserModuleProgress(Base):
     time_spent = Column(Float, default=0)  # in minutes
     last_accessed = Column(DateTime, default=datetime.utcnow)
     current_section = Column(String(255))
-    quiz_scores = Column(JSON, default=[])
+    quiz_scores = Column(JSONB, default=[])
     
     # Performance tracking
     average_attention = Column(Float)
     average_engagement = Column(Float)
-    struggle_points = Column(JSON, default=[])
+    struggle_points = Column(JSONB, default=[])
     
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
@@ -268,16 +288,16 @@ class AssessmentResult(Base):
     module_id = Column(UUID(as_uuid=True), ForeignKey('learning_modules.id'), nullable=False)
     
     assessment_type = Column(String(50), default='quiz')
-    questions = Column(JSON, default=[])
-    answers = Column(JSON, default=[])
-    correct_answers = Column(JSON, default=[])
+    questions = deferred(Column(JSONB, default=[]))
+    answers = deferred(Column(JSONB, default=[]))
+    correct_answers = deferred(Column(JSONB, default=[]))
     
     score = Column(Float)
     time_taken = Column(Integer)  # in seconds
     attempts = Column(Integer, default=1)
     
     # Cognitive state during assessment
-    cognitive_state = Column(JSON, default={})
+    cognitive_state = Column(JSONB, default={})
     
     created_at = Column(DateTime, default=datetime.utcnow)
     
@@ -300,8 +320,8 @@ class BreakActivity(Base):
     notes = Column(Text)
     
     # Context
-    pre_break_state = Column(JSON, default={})
-    post_break_state = Column(JSON, default={})
+    pre_break_state = Column(JSONB, default={})
+    post_break_state = Column(JSONB, default={})
     
     created_at = Column(DateTime, default=datetime.utcnow)
     
@@ -321,7 +341,7 @@ class Discussion(Base):
     title = Column(String(255), nullable=False)
     content = Column(Text, nullable=False)
     category = Column(String(100), default='general')
-    tags = Column(JSON, default=[])
+    tags = Column(JSONB, default=[])
     
     active = Column(Boolean, default=True)
     pinned = Column(Boolean, default=False)
@@ -395,7 +415,7 @@ class Challenge(Base):
     end_date = Column(DateTime, nullable=False)
     reward_points = Column(Integer, default=0)
     
-    requirements = Column(JSON, default={})
+    requirements = Column(JSONB, default={})
     active = Column(Boolean, default=True)
     
     created_at = Column(DateTime, default=datetime.utcnow)
@@ -477,7 +497,7 @@ class SystemSettings(Base):
     
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     key = Column(String(255), unique=True, nullable=False)
-    value = Column(JSON, nullable=False)
+    value = Column(JSONB, nullable=False)
     description = Column(Text)
     
     updated_by = Column(UUID(as_uuid=True), ForeignKey('users.id'))
@@ -491,23 +511,24 @@ class SystemSettings(Base):
 class ErrorLog(Base):
     __tablename__ = 'error_logs'
     
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    id = Column(BigInteger, primary_key=True, autoincrement=True)
     user_id = Column(UUID(as_uuid=True), ForeignKey('users.id'))
     
     error_type = Column(String(100), nullable=False)
     message = Column(Text, nullable=False)
-    stack_trace = Column(Text)
+    # Large and only read when inspecting one error: loaded on access
+    stack_trace = deferred(Column(Text))
     
     # Context data
     url = Column(String(500))
     user_agent = Column(String(500))
-    component_stack = Column(Text)
+    component_stack = deferred(Column(Text))
     
     # Error metadata
     severity = Column(String(50), default='medium')
     resolved = Column(Boolean, default=False)
     
-    created_at = Column(DateTime, default=datetime.utcnow)
+    created_at = Column(DateTime, primary_key=True, default=datetime.utcnow)
     
     # Indexes
     __table_args__ = (
@@ -515,12 +536,13 @@ class ErrorLog(Base):
         Index('idx_error_type', 'error_type'),
         Index('idx_error_created_at', 'created_at'),
         Index('idx_error_severity', 'severity'),
+        {'postgresql_partition_by': 'RANGE (created_at)'},
     )
 
 class PerformanceMetric(Base):
     __tablename__ = 'performance_metrics'
     
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    id = Column(BigInteger, primary_key=True, autoincrement=True)
     user_id = Column(UUID(as_uuid=True), ForeignKey('users.id'))
     
     metric_type = Column(String(100), nullable=False)
@@ -532,11 +554,23 @@ class PerformanceMetric(Base):
     page_url = Column(String(500))
     user_agent = Column(String(500))
     
-    created_at = Column(DateTime, default=datetime.utcnow)
+    created_at = Column(DateTime, primary_key=True, default=datetime.utcnow)
     
     # Indexes
     __table_args__ = (
         Index('idx_perf_user_id', 'user_id'),
         Index('idx_perf_type', 'metric_type'),
         Index('idx_perf_created_at', 'created_at'),
-    )
\ No newline at end of file
+        {'postgresql_partition_by': 'RANGE (created_at)'},
+    )
+
+
+def _create_partitions(table, connection, **kw):
+    # A partitioned parent holds no rows itself: give it its DEFAULT and
+    # current monthly partitions as soon as create_all makes it
+    if connection.dialect.name == 'postgresql':
+        ensure_monthly_partitions(connection, tables=(table.name,))
+
+
+for _table_name in PARTITIONED_TABLES:
+    event.listen(Base.metadata.tables[_table_name], 'after_create', _create_partitions)
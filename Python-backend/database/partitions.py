@@ -0,0 +1,70 @@
+import os
+import sys
+from datetime import date
+from typing import List, Optional, Sequence
+
+from sqlalchemy import create_engine, text
+
+# Tables declared with postgresql_partition_by='RANGE (created_at)' in models.py
+PARTITIONED_TABLES = (
+    'emotion_analyses',
+    'attention_tracking',
+    'fatigue_detection',
+    'performance_metrics',
+    'error_logs',
+)
+
+
+def _add_months(day: date, months: int) -> date:
+    month_index = day.month - 1 + months
+    return date(day.year + month_index // 12, month_index % 12 + 1, 1)
+
+
+def monthly_partition_ddl(table: str, month: date) -> str:
+    """CREATE TABLE ... PARTITION OF for the calendar month containing `month`"""
+    start = date(month.year, month.month, 1)
+    end = _add_months(start, 1)
+    return (
+        f"CREATE TABLE IF NOT EXISTS {table}_{start:%Y_%m} PARTITION OF {table} "
+        f"FOR VALUES FROM ('{start.isoformat()}') TO ('{end.isoformat()}')"
+    )
+
+
+def default_partition_ddl(table: str) -> str:
+    """CREATE TABLE ... DEFAULT partition: catches rows outside every monthly
+    range, so inserts never fail with "no partition of relation found"."""
+    return f"CREATE TABLE IF NOT EXISTS {table}_default PARTITION OF {table} DEFAULT"
+
+
+def ensure_monthly_partitions(connection, months_ahead: int = 2, start: Optional[date] = None,
+                              tables: Sequence[str] = PARTITIONED_TABLES) -> List[str]:
+    """Create the DEFAULT partition plus this month's and the next
+    `months_ahead` monthly partitions of every telemetry table. Idempotent;
+    runs when models.py creates the tables and should be re-run monthly
+    (e.g. from cron) so upcoming months get their own partition.
+
+    Retention is then a DROP TABLE of an old partition instead of a DELETE.
+    """
+    start = start or date.today()
+    statements = []
+    for table in tables:
+        # Monthly ranges first: a DEFAULT partition that already holds rows
+        # for a month would block creating that month's partition
+        statements.extend(
+            monthly_partition_ddl(table, _add_months(start.replace(day=1), offset))
+            for offset in range(months_ahead + 1)
+        )
+        statements.append(default_partition_ddl(table))
+    for statement in statements:
+        connection.execute(text(statement))
+    return statements
+
+
+if __name__ == "__main__":
+    # Monthly cron entry point: DATABASE_URL=postgresql://... python -m database.partitions
+    url = os.getenv("DATABASE_URL")
+    if not url:
+        sys.exit("DATABASE_URL is not set")
+    with create_engine(url).begin() as conn:
+        for statement in ensure_monthly_partitions(conn):
+            print(statement)
@@ -1,12 +1,182 @@
+import asyncio
+import bisect
 import logging
-from typing import Dict, List, Optional
-from datetime import datetime
-import statistics
+from collections import deque
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+import math
 import re
+import threading
+import time
+from cachetools import LRUCache
+from core.batching import MicroBatcher
+from core.clock import iso_now
 from services.learning_model import get_model
 
 logger = logging.getLogger(__name__)
 
+# In-memory module templates per subject (a content DB in production);
+# generate_learning_path copies each module before personalising it
+_SUBJECT_MODULES: Dict[str, tuple] = {
+    "machine_learning": (
+        {"id": "ml_intro", "title": "Intro to ML", "difficulty": "beginner", "duration": 45},
+        {"id": "ml_algorithms", "title": "ML Algorithms", "difficulty": "intermediate", "duration": 60},
+        {"id": "deep_learning", "title": "Deep Learning", "difficulty": "advanced", "duration": 90},
+    ),
+    "computer_vision": (
+        {"id": "cv_basics", "title": "CV Basics", "difficulty": "beginner", "duration": 50},
+        {"id": "cv_advanced", "title": "Advanced CV", "difficulty": "advanced", "duration": 75},
+    ),
+}
+
+_SPECIFIC_RECOMMENDATIONS: Dict[str, tuple] = {
+    "advance": ({"type": "project", "title": "Capstone Project"},),
+    "practice": ({"type": "practice_quiz", "title": "Extra Practice"},),
+    "review": ({"type": "tutorial", "title": "Concept Review"},),
+}
+
+
+_MODEL_META = None
+_MODEL_META_LOCK = threading.Lock()
+
+
+def _get_model_meta():
+    """(model, info, raw_columns, raw_column_set, min_overlap) for the learning model.
+
+    The model is loaded once per process and its metadata never changes, so
+    this is resolved on first use and reused by every request.
+    """
+    global _MODEL_META
+    if _MODEL_META is None:
+        with _MODEL_META_LOCK:
+            if _MODEL_META is None:
+                model = get_model()
+                raw_columns = getattr(model, "raw_columns", None) or []
+                # a request must name at least a quarter of the raw columns
+                min_overlap = max(1, len(raw_columns) // 4)
+                _MODEL_META = (model, model.info(), raw_columns, frozenset(raw_columns), min_overlap)
+    return _MODEL_META
+
+
+# 0-100 score -> (action, content_type): below 50, 50-69, 70-84, 85 and up
+_SCORE_THRESHOLDS = (50, 70, 85)
+_SCORE_ACTIONS = (
+    ("review", "simplified_explanation"),
+    ("practice", "worked_examples"),
+    ("continue", "practice_exercises"),
+    ("advance", "challenging_exercises"),
+)
+
+
+def _classify(score: float):
+    return _SCORE_ACTIONS[bisect.bisect_right(_SCORE_THRESHOLDS, score)]
+
+
+def _compute_adaptations(mask: int) -> Dict:
+    """Adaptation decisions for one combination of the threshold bits packed
+    in adapt_content; primary_format None means keep the content's own."""
+    confused, engaged, attentive, inattentive, disengaged, very_attentive, very_engaged, fatigued, unclear = (
+        bool(mask >> bit & 1) for bit in range(9)
+    )
+    adaptations = {
+        "difficulty_adjustment": None,  # increase|decrease|maintain
+        "explanation_style": "concise",  # concise|detailed
+        "interactivity_level": "medium",  # low|medium|high
+        "break_suggestion": False,
+        "pacing": "normal",
+        "primary_format": None
+    }
+
+    # Difficulty
+    if confused:
+        adaptations["difficulty_adjustment"] = "decrease"
+        adaptations["explanation_style"] = "detailed"
+    elif engaged and attentive:
+        adaptations["difficulty_adjustment"] = "increase"
+
+    # Interactivity & pacing
+    if inattentive or disengaged:
+        adaptations["interactivity_level"] = "high"
+    elif very_attentive and very_engaged:
+        adaptations["interactivity_level"] = "low"
+
+    if fatigued:
+        adaptations["break_suggestion"] = True
+        adaptations["pacing"] = "slower"
+
+    # Format preferences
+    if unclear:
+        adaptations["primary_format"] = "visual"
+    elif inattentive:
+        adaptations["primary_format"] = "interactive"
+
+    return adaptations
+
+
+# Every outcome of the adapt_content thresholds, indexed by their 9-bit mask
+_ADAPT_TABLE = [_compute_adaptations(mask) for mask in range(1 << 9)]
+
+
+@lru_cache(maxsize=128)
+def _path_for(subject: str, opt_len: int) -> Tuple[tuple, int]:
+    """(module templates, total duration) for `subject`, split into sessions
+    of at most `opt_len` minutes; callers copy each module before handing it out."""
+    path = []
+    total_duration = 0
+    for m in _SUBJECT_MODULES.get(subject, ()):
+        mod = m.copy()
+        total_duration += mod.get("duration", 0)
+        # prefer shorter sessions if profile.optimal_session_length is small
+        if mod.get("duration", 0) > opt_len:
+            mod["sessions"] = max(1, int(-(-mod["duration"] // opt_len)))
+            mod["session_duration"] = opt_len
+        else:
+            mod["sessions"] = 1
+            mod["session_duration"] = mod.get("duration", opt_len)
+        path.append(mod)
+    return tuple(path), total_duration
+
+
+async def _predict_rows(rows: List[Dict]) -> List[float]:
+    # One estimator call per batch, off the event loop
+    return await asyncio.to_thread(get_model().predict_batch, rows)
+
+
+# Concurrent recommend_next_content calls share one model.predict
+_predict_batcher = MicroBatcher(_predict_rows, max_batch=32, max_wait=0.002, name="learning_model")
+
+
+def get_predict_batcher() -> MicroBatcher:
+    return _predict_batcher
+
+
+# Striped locks around profile read-modify-write: a user always maps to the
+# same stripe, so concurrent users rarely contend
+_PROFILE_LOCK_STRIPES = 16
+_profile_locks = [asyncio.Lock() for _ in range(_PROFILE_LOCK_STRIPES)]
+
+
+def _lock_for(user_id: str) -> asyncio.Lock:
+    return _profile_locks[hash(user_id) & (_PROFILE_LOCK_STRIPES - 1)]
+
+
+# Per-process caps on in-memory state; least recently used entries go first
+MAX_USER_PROFILES = 10_000
+MAX_LEARNING_PATHS = 50_000
+
+
+class _EvictionLoggingLRU(LRUCache):
+    """LRUCache that logs each eviction at debug level"""
+
+    def __init__(self, maxsize: int, name: str):
+        super().__init__(maxsize=maxsize)
+        self._name = name
+
+    def popitem(self):
+        key, value = super().popitem()
+        logger.debug("%s cache full (maxsize=%d), evicted %s", self._name, self.maxsize, key)
+        return key, value
+
 
 class AdaptiveLearningService:
     """Clean, dependency-light adaptive learning service.
@@ -16,9 +186,9 @@ class AdaptiveLearningService:
     dependencies are required.
     """
 
-    def __init__(self) -> None:
-        self.user_profiles: Dict[str, Dict] = {}
-        self.learning_paths: Dict[str, Dict] = {}
+    def __init__(self, max_profiles: int = MAX_USER_PROFILES, max_paths: int = MAX_LEARNING_PATHS) -> None:
+        self.user_profiles: Dict[str, Dict] = _EvictionLoggingLRU(max_profiles, "user_profiles")
+        self.learning_paths: Dict[str, Dict] = _EvictionLoggingLRU(max_paths, "learning_paths")
 
     # Public API
     async def adapt_content(self, user_id: str, cognitive_state: Dict, current_content: Dict) -> Dict:
@@ -27,64 +197,48 @@ class AdaptiveLearningService:
         cognitive_state expects values in 0-100 for keys: attention, engagement,
         confusion, fatigue and optional learning_performance (0-100).
         """
-        profile = self.user_profiles.setdefault(user_id, self._create_profile(user_id))
+        profile = self._get_profile(user_id)
 
-        # store recent metrics in profile
-        self._push_metric(profile, "attention", cognitive_state.get("attention"))
-        if "learning_performance" in cognitive_state:
-            self._push_metric(profile, "performance", cognitive_state.get("learning_performance"))
+        # store recent metrics in profile; one user's updates stay ordered
+        async with _lock_for(user_id):
+            self._push_metric(profile, "attention", cognitive_state.get("attention"))
+            if "learning_performance" in cognitive_state:
+                self._push_metric(profile, "performance", cognitive_state.get("learning_performance"))
 
-        # compute simple indicators
-        attention = self._recent_mean(profile, "attention", default=50)
+            # compute simple indicators
+            attention = self._recent_mean(profile, "attention", default=50)
         engagement = cognitive_state.get("engagement", attention)
         confusion = cognitive_state.get("confusion", 0)
         fatigue = cognitive_state.get("fatigue", 0)
 
-        adaptations = {
-            "difficulty_adjustment": None,  # increase|decrease|maintain
-            "explanation_style": "concise",  # concise|detailed
-            "interactivity_level": "medium",  # low|medium|high
-            "break_suggestion": False,
-            "pacing": "normal",
-            "primary_format": current_content.get("primary_format", "text")
-        }
-
-        # Difficulty
-        if confusion >= 60:
-            adaptations["difficulty_adjustment"] = "decrease"
-            adaptations["explanation_style"] = "detailed"
-        elif engagement >= 75 and attention >= 70:
-            adaptations["difficulty_adjustment"] = "increase"
-
-        # Interactivity & pacing
-        if attention < 40 or engagement < 40:
-            adaptations["interactivity_level"] = "high"
-        elif attention > 80 and engagement > 80:
-            adaptations["interactivity_level"] = "low"
-
-        if fatigue > 70:
-            adaptations["break_suggestion"] = True
-            adaptations["pacing"] = "slower"
-
-        # Format preferences
-        if confusion > 50:
-            adaptations["primary_format"] = "visual"
-        elif attention < 40:
-            adaptations["primary_format"] = "interactive"
-
-        adapted = self._apply_adaptations(current_content.copy(), adaptations)
+        mask = (
+            (confusion >= 60)
+            | (engagement >= 75) << 1
+            | (attention >= 70) << 2
+            | (attention < 40) << 3
+            | (engagement < 40) << 4
+            | (attention > 80) << 5
+            | (engagement > 80) << 6
+            | (fatigue > 70) << 7
+            | (confusion > 50) << 8
+        )
+        adaptations = _ADAPT_TABLE[mask].copy()
+        if adaptations["primary_format"] is None:
+            adaptations["primary_format"] = current_content.get("primary_format", "text")
+
+        adapted = self._apply_adaptations(current_content, adaptations)
 
         confidence = self._calc_confidence(profile, cognitive_state)
 
         # lightweight log
-        logger.info(f"adapt_content user={user_id} adaptations={adaptations} confidence={confidence:.2f}")
+        logger.info("adapt_content user=%s adaptations=%s confidence=%.2f", user_id, adaptations, confidence)
 
         return {
             "success": True,
             "adapted_content": adapted,
             "adaptations": adaptations,
             "confidence": round(confidence, 2),
-            "timestamp": datetime.now().isoformat()
+            "timestamp": iso_now()
         }
 
     async def generate_learning_path(self, user_id: str, subject: str, target_competency: str) -> Dict:
@@ -93,29 +247,19 @@ class AdaptiveLearningService:
         This function uses in-memory module templates. In production this
         would query a content DB.
         """
-        profile = self.user_profiles.setdefault(user_id, self._create_profile(user_id))
-
-        modules = self._subject_modules().get(subject, [])
-        path = []
-        for m in modules:
-            mod = m.copy()
-            # prefer shorter sessions if profile.optimal_session_length is small
-            opt_len = profile.get("optimal_session_length", 45)
-            if mod.get("duration", 0) > opt_len:
-                mod["sessions"] = max(1, int((mod["duration"] + opt_len - 1) // opt_len))
-                mod["session_duration"] = opt_len
-            else:
-                mod["sessions"] = 1
-                mod["session_duration"] = mod.get("duration", opt_len)
-            path.append(mod)
-
-        path_id = f"{user_id}:{subject}:{int(datetime.now().timestamp())}"
+        profile = self._get_profile(user_id)
+
+        opt_len = profile.get("optimal_session_length", 45)
+        templates, total_duration = _path_for(subject, opt_len)
+        path = [dict(m) for m in templates]
+
+        path_id = f"{user_id}:{subject}:{int(time.time())}"
         self.learning_paths[path_id] = {
             "user_id": user_id,
             "subject": subject,
             "target": target_competency,
             "modules": path,
-            "created_at": datetime.now().isoformat(),
+            "created_at": iso_now(),
             "progress": 0
         }
 
@@ -123,7 +267,7 @@ class AdaptiveLearningService:
             "success": True,
             "path_id": path_id,
             "learning_path": path,
-            "estimated_duration": sum(m.get("duration", 0) for m in path),
+            "estimated_duration": total_duration,
         }
 
     async def recommend_next_content(self, user_id: str, performance: Dict) -> Dict:
@@ -136,8 +280,7 @@ class AdaptiveLearningService:
 
         # Try model-backed recommendation first
         try:
-            model = get_model()
-            info = model.info()
+            model, info, expected, expected_set, min_overlap = _get_model_meta()
             if info.get("available"):
                 # Build a feature dict and attempt to map it to the model's
                 # expected raw columns. If overlap is insufficient we'll skip
@@ -145,11 +288,6 @@ class AdaptiveLearningService:
                 # If frontend supplied tokenized features (num__/cat__) or raw
                 # training column names, prefer them. Otherwise fall back to
                 # summary stats (score/time/mistake_count).
-                if isinstance(performance, dict):
-                    provided_keys = set(performance.keys())
-                else:
-                    provided_keys = set()
-
                 # Normalize/map incoming features to the model's expected names
                 def _normalize_features_for_model(perf: Dict, model) -> Dict:
                     mapped = {}
@@ -164,7 +302,7 @@ class AdaptiveLearningService:
                     if isinstance(client_raw, dict):
                         for k, v in client_raw.items():
                             # exact match
-                            if k in raw_cols:
+                            if k in expected_set:
                                 mapped[k] = v
                                 continue
                             # case-insensitive match
@@ -209,7 +347,7 @@ class AdaptiveLearningService:
                                     mapped[k] = v
                         else:
                             # copy over summary metrics if they match expected raw or token columns
-                            if k in raw_cols:
+                            if k in expected_set:
                                 mapped[k] = v
                             elif k in token_cols:
                                 mapped[k] = v
@@ -217,7 +355,7 @@ class AdaptiveLearningService:
                     # 3) As a final pass, try to include numeric summary keys
                     for summary_key in ('score', 'time_taken', 'mistake_count', 'mistakes', 'duration'):
                         if summary_key in perf and summary_key not in mapped:
-                            if summary_key in raw_cols:
+                            if summary_key in expected_set:
                                 mapped[summary_key] = perf[summary_key]
                             elif summary_key in token_cols:
                                 mapped[summary_key] = perf[summary_key]
@@ -225,22 +363,18 @@ class AdaptiveLearningService:
                     return mapped
 
                 features = _normalize_features_for_model(performance, model)
-                provided_keys = set(features.keys())
+                provided_keys = features.keys()
 
                 # If model exposes expected raw_columns, check for overlap with
                 # provided raw names first (e.g. 'age','school'). If sufficient
                 # overlap, use those raw fields.
-                expected = getattr(getattr(self, '_model', None) or get_model(), "raw_columns", None)
-                if expected:
-                    raw_overlap = sum(1 for c in expected if c in provided_keys)
-                else:
-                    raw_overlap = 0
+                raw_overlap = len(expected_set & provided_keys)
 
                 has_token_keys = any(k.startswith('num__') or k.startswith('cat__') for k in provided_keys)
 
-                if raw_overlap >= max(1, (len(expected) // 4) if expected else 1):
+                if raw_overlap >= min_overlap:
                     # features already normalized above; keep those that match expected
-                    features = {c: v for c, v in features.items() if c in expected}
+                    features = {c: v for c, v in features.items() if c in expected_set}
                     logger.info("Using normalized client-provided raw feature names (overlap=%s)", raw_overlap)
                 elif has_token_keys:
                     # If token keys exist, prefer those (they may already be present in features)
@@ -248,7 +382,8 @@ class AdaptiveLearningService:
                     for k in performance.keys():
                         if (k.startswith('num__') or k.startswith('cat__')) and k not in features:
                             features[k] = performance.get(k)
-                    logger.info("Using client-provided tokenized features (count=%s)", len([k for k in features.keys() if k.startswith('num__') or k.startswith('cat__')]))
+                    if logger.isEnabledFor(logging.INFO):
+                        logger.info("Using client-provided tokenized features (count=%s)", sum(1 for k in features if k.startswith(('num__', 'cat__'))))
                 else:
                     # Fallback: use summary metrics only
                     features = {
@@ -260,32 +395,21 @@ class AdaptiveLearningService:
                 # If the model exposes raw_columns we can try to provide
                 # values for them. Otherwise we'll rely on whatever saved
                 # columns the model reports.
-                expected = getattr(model, "raw_columns", None)
-                provided = set(features.keys())
-                logger.info("Model expected columns: %s", (expected if expected is not None else []))
-                logger.info("Provided feature keys count=%s sample=%s", len(provided), list(provided)[:10])
+                provided = features.keys()
+                logger.info("Model expected columns: %s", expected)
+                if logger.isEnabledFor(logging.INFO):
+                    logger.info("Provided feature keys count=%s sample=%s", len(provided), list(provided)[:10])
                 if not expected:
                     logger.info("Model available but no raw_columns metadata present; skipping model to avoid incompatible input shapes.")
                 else:
-                    overlap = sum(1 for c in expected if c in provided)
+                    overlap = len(expected_set & provided)
                     logger.info("Model/provided overlap=%s of expected=%s", overlap, len(expected))
-                    if overlap < max(1, len(expected) // 4):
+                    if overlap < min_overlap:
                         logger.info("Model available but provided features don't match expected raw columns (overlap=%s). Skipping model.", overlap)
                     else:
-                        pred = model.predict(features)
+                        pred = await _predict_batcher.submit(features)
                         # Map numeric prediction to actions (0-100 -> categories)
-                        if pred >= 85:
-                            action = "advance"
-                            content_type = "challenging_exercises"
-                        elif pred >= 70:
-                            action = "continue"
-                            content_type = "practice_exercises"
-                        elif pred >= 50:
-                            action = "practice"
-                            content_type = "worked_examples"
-                        else:
-                            action = "review"
-                            content_type = "simplified_explanation"
+                        action, content_type = _classify(pred)
 
                         recs = self._specific_recommendations(action, mistakes)
 
@@ -302,18 +426,7 @@ class AdaptiveLearningService:
 
         # Heuristic fallback (existing logic)
         score = score if score is not None else performance.get("score", 0)
-        if score >= 85:
-            action = "advance"
-            content_type = "challenging_exercises"
-        elif score >= 70:
-            action = "continue"
-            content_type = "practice_exercises"
-        elif score >= 50:
-            action = "practice"
-            content_type = "worked_examples"
-        else:
-            action = "review"
-            content_type = "simplified_explanation"
+        action, content_type = _classify(score)
 
         recs = self._specific_recommendations(action, mistakes)
 
@@ -330,66 +443,92 @@ class AdaptiveLearningService:
         if not profile:
             return {"success": False, "error": "no profile"}
 
-        attention = profile.get("metrics", {}).get("attention", [])
-        perf = profile.get("metrics", {}).get("performance", [])
+        attention = profile["metrics"]["attention"]
+        perf = profile["metrics"]["performance"]
 
         return {
             "success": True,
             "attention": {
                 "count": len(attention),
-                "average": round(statistics.mean(attention), 2) if attention else None
+                "average": round(self._recent_mean(profile, "attention"), 2) if attention else None
             },
             "performance": {
                 "count": len(perf),
-                "average": round(statistics.mean(perf), 2) if perf else None
+                "average": round(self._recent_mean(profile, "performance"), 2) if perf else None
             }
         }
 
     # Helpers
+    def _get_profile(self, user_id: str) -> Dict:
+        # Build a new profile only on a miss, not on every call
+        profile = self.user_profiles.get(user_id)
+        if profile is None:
+            profile = self.user_profiles[user_id] = self._create_profile(user_id)
+        return profile
+
     def _create_profile(self, user_id: str) -> Dict:
         return {
             "user_id": user_id,
             "learning_style": "visual",
             "preferred_difficulty": "intermediate",
             "optimal_session_length": 45,
-            "metrics": {"attention": [], "performance": []},
-            "created_at": datetime.now().isoformat(),
+            # ring buffers: the last 100 readings of each metric
+            "metrics": {"attention": deque(maxlen=100), "performance": deque(maxlen=100)},
+            # running sum / sum of squares over each buffer's current contents
+            "stats": {
+                "attention": {"sum": 0.0, "sumsq": 0.0},
+                "performance": {"sum": 0.0, "sumsq": 0.0},
+            },
+            "created_at": iso_now(),
         }
 
     def _push_metric(self, profile: Dict, key: str, value: Optional[float]) -> None:
-        try:
-            if value is None:
-                return
-            if key == "attention":
-                profile["metrics"]["attention"].append(float(value))
-                # keep last 100
-                profile["metrics"]["attention"] = profile["metrics"]["attention"][-100:]
-            elif key == "performance":
-                profile["metrics"]["performance"].append(float(value))
-                profile["metrics"]["performance"] = profile["metrics"]["performance"][-100:]
-        except Exception:
-            logger.exception("_push_metric failed")
+        # Only numeric readings of tracked metrics are recorded; anything else
+        # (None, strings, unknown keys) is ignored
+        if not isinstance(value, (int, float)) or key not in ("attention", "performance"):
+            return
+        value = float(value)
+        vals = profile["metrics"][key]
+        stats = profile["stats"][key]
+        if len(vals) == vals.maxlen:
+            old = vals[0]  # evicted by the append below
+            stats["sum"] -= old
+            stats["sumsq"] -= old * old
+        vals.append(value)
+        stats["sum"] += value
+        stats["sumsq"] += value * value
 
     def _recent_mean(self, profile: Dict, key: str, default: float = 50.0) -> float:
-        vals = profile.get("metrics", {}).get(key, [])
-        try:
-            return statistics.mean(vals) if vals else float(default)
-        except Exception:
+        n = len(profile["metrics"][key])
+        if not n:
             return float(default)
+        return profile["stats"][key]["sum"] / n
+
+    def _recent_pstdev(self, profile: Dict, key: str, default: float = 50.0) -> float:
+        n = len(profile["metrics"][key])
+        if not n:
+            return float(default)
+        stats = profile["stats"][key]
+        mean = stats["sum"] / n
+        return math.sqrt(max(0.0, stats["sumsq"] / n - mean * mean))
 
     def _apply_adaptations(self, content: Dict, adaptations: Dict) -> Dict:
-        content.setdefault("difficulty_level", 2)
+        """Return a new dict: `content` overlaid with the adapted keys (content is not modified)"""
+        difficulty = content.get("difficulty_level", 2)
         if adaptations.get("difficulty_adjustment") == "decrease":
-            content["difficulty_level"] = max(1, content["difficulty_level"] - 1)
+            difficulty = max(1, difficulty - 1)
         elif adaptations.get("difficulty_adjustment") == "increase":
-            content["difficulty_level"] = min(4, content["difficulty_level"] + 1)
+            difficulty = min(4, difficulty + 1)
 
-        content["explanation_mode"] = adaptations.get("explanation_style", "concise")
-        content["interactivity_level"] = adaptations.get("interactivity_level", "medium")
-        content["primary_format"] = adaptations.get("primary_format", content.get("primary_format", "text"))
-        content["pacing"] = adaptations.get("pacing", "normal")
-        content["break_suggestion"] = adaptations.get("break_suggestion", False)
-        return content
+        return {
+            **content,
+            "difficulty_level": difficulty,
+            "explanation_mode": adaptations.get("explanation_style", "concise"),
+            "interactivity_level": adaptations.get("interactivity_level", "medium"),
+            "primary_format": adaptations.get("primary_format", content.get("primary_format", "text")),
+            "pacing": adaptations.get("pacing", "normal"),
+            "break_suggestion": adaptations.get("break_suggestion", False),
+        }
 
     def _calc_confidence(self, profile: Dict, cognitive_state: Dict) -> float:
         # simple heuristic based on how many metrics we have and how extreme values are
@@ -401,31 +540,9 @@ class AdaptiveLearningService:
         if perf:
             base += 0.2
         # reward consistency
-        try:
-            att_var = statistics.pstdev(att) if att else 50
-            base += max(0, (50 - att_var) / 100)
-        except Exception:
-            pass
+        att_var = self._recent_pstdev(profile, "attention")
+        base += max(0, (50 - att_var) / 100)
         return min(1.0, base)
 
     def _specific_recommendations(self, action: str, mistakes: List) -> List[Dict]:
-        if action == "advance":
-            return [{"type": "project", "title": "Capstone Project"}]
-        if action == "practice":
-            return [{"type": "practice_quiz", "title": "Extra Practice"}]
-        if action == "review":
-            return [{"type": "tutorial", "title": "Concept Review"}]
-        return []
-
-    def _subject_modules(self) -> Dict[str, List[Dict]]:
-        return {
-            "machine_learning": [
-                {"id": "ml_intro", "title": "Intro to ML", "difficulty": "beginner", "duration": 45},
-                {"id": "ml_algorithms", "title": "ML Algorithms", "difficulty": "intermediate", "duration": 60},
-                {"id": "deep_learning", "title": "Deep Learning", "difficulty": "advanced", "duration": 90},
-            ],
-            "computer_vision": [
-                {"id": "cv_basics", "title": "CV Basics", "difficulty": "beginner", "duration": 50},
-                {"id": "cv_advanced", "title": "Advanced CV", "difficulty": "advanced", "duration": 75},
-            ]
-        }
\ No newline at end of file
+        return list(_SPECIFIC_RECOMMENDATIONS.get(action, ()))
@@ -1,6 +1,7 @@
 import numpy as np
 import pandas as pd
 from datetime import datetime, timedelta
+from core.clock import iso_now
 from typing import Dict, List, Optional, Tuple
 import logging
 from sklearn.cluster import KMeans
@@ -46,7 +47,7 @@ class AdvancedAnalyticsService:
             
             return {
                 "user_id": user_id,
-                "analysis_date": datetime.now().isoformat(),
+                "analysis_date": iso_now(),
                 "data_points": len(session_data),
                 "learning_clusters": clusters,
                 "temporal_patterns": temporal_patterns,
@@ -598,7 +599,7 @@ class AdvancedAnalyticsService:
             
             return {
                 "user_id": user_id,
-                "prediction_date": datetime.now().isoformat(),
+                "prediction_date": iso_now(),
                 "next_session_performance": next_performance,
                 "optimal_schedule": optimal_schedule,
                 "wellness_prediction": wellness_prediction,
@@ -4,7 +4,9 @@ import logging
 from typing import Dict, List, Optional, Tuple
 import asyncio
 from datetime import datetime, timedelta
-import os
+from core.clock import iso_now
+from core.settings import settings
+from core.frames import Frame, decode_frame
 import math
 
 logger = logging.getLogger(__name__)
@@ -22,20 +24,20 @@ class AttentionTrackingService:
         self.mpf = None  # MediaPipe disabled; using OpenCV-only path
         
         # Thresholds
-        # Read from environment when available for easy calibration
+        # From core.settings (env vars of the same name) for easy calibration
         # ATTENTION_SCORE_THRESHOLD expects 0-1 range; others are degrees or counts
-        self.attention_threshold = float(os.getenv('ATTENTION_SCORE_THRESHOLD', '0.7'))
-        self.blink_rate_threshold = int(os.getenv('ATTENTION_BLINK_RATE_THRESHOLD', '20'))  # blinks per minute
-        self.gaze_deviation_threshold = float(os.getenv('ATTENTION_GAZE_DEVIATION_THRESHOLD', '30'))  # degrees
-        self.head_deviation_threshold = float(os.getenv('ATTENTION_HEAD_DEVIATION_THRESHOLD', '20'))  # |yaw|+|pitch|
+        self.attention_threshold = settings.attention_score_threshold
+        self.blink_rate_threshold = settings.attention_blink_rate_threshold  # blinks per minute
+        self.gaze_deviation_threshold = settings.attention_gaze_deviation_threshold  # degrees
+        self.head_deviation_threshold = settings.attention_head_deviation_threshold  # |yaw|+|pitch|
 
         # Penalty weights (configurable)
-        self.blink_penalty_weight = float(os.getenv('ATTENTION_PENALTY_BLINK_WEIGHT', '2.0'))
-        self.gaze_penalty_weight = float(os.getenv('ATTENTION_PENALTY_GAZE_WEIGHT', '1.5'))
-        self.head_penalty_weight = float(os.getenv('ATTENTION_PENALTY_HEAD_WEIGHT', '1.2'))
+        self.blink_penalty_weight = settings.attention_penalty_blink_weight
+        self.gaze_penalty_weight = settings.attention_penalty_gaze_weight
+        self.head_penalty_weight = settings.attention_penalty_head_weight
 
         # Smoothing params (EWMA)
-        self.smoothing_alpha = float(os.getenv('ATTENTION_SMOOTHING_ALPHA', '0.4'))  # 0..1
+        self.smoothing_alpha = settings.attention_smoothing_alpha  # 0..1
         self._smoothed_attention = None
         
         self._load_models()
@@ -55,7 +57,7 @@ class AttentionTrackingService:
         except Exception as e:
             logger.error(f"❌ Failed to load attention models: {e}")
     
-    async def track_attention(self, frame_data: str) -> Dict:
+    async def track_attention(self, frame_data: Frame) -> Dict:
         """Track attention level from camera frame"""
         try:
             # Decode frame (reuse from emotion service)
@@ -74,7 +76,7 @@ class AttentionTrackingService:
                     "blink_rate": 0,
                     "head_pose": {"pitch": 0, "yaw": 0, "roll": 0},
                     "focus_level": "low",
-                    "timestamp": datetime.now().isoformat()
+                    "timestamp": iso_now()
                 }
             
             # Process largest face
@@ -131,30 +133,24 @@ class AttentionTrackingService:
                 "head_pose": head_pose,
                 "focus_level": focus_level,
                 "face_detected": True,
-                "timestamp": datetime.now().isoformat()
+                "timestamp": iso_now()
             }
             
         except Exception as e:
             logger.error(f"Attention tracking failed: {e}")
             return {"error": str(e)}
     
-    def _decode_frame(self, frame_data: str) -> Optional[np.ndarray]:
-        """Decode base64 frame data (shared with emotion service)"""
-        try:
-            import base64
-            
-            if ',' in frame_data:
-                frame_data = frame_data.split(',')[1]
-            
-            frame_bytes = base64.b64decode(frame_data)
-            nparr = np.frombuffer(frame_bytes, np.uint8)
-            frame = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
-            
-            return frame
-            
-        except Exception as e:
-            logger.error(f"Failed to decode frame: {e}")
-            return None
+    async def track_attention_batch(self, frames: List[str]) -> List[Dict]:
+        """Track attention for several frames.
+
+        The OpenCV pipeline has no batched model call, so frames are processed
+        in order; this keeps the interface symmetric with the emotion service.
+        """
+        return [await self.track_attention(frame_data) for frame_data in frames]
+    
+    def _decode_frame(self, frame_data: Frame) -> Optional[np.ndarray]:
+        """Decode base64 frame data (shared with emotion service); decoded arrays pass through"""
+        return decode_frame(frame_data)
 
     def _detect_eyes(self, face_roi_gray: np.ndarray) -> List[Tuple[int, int, int, int]]:
         """Detect eyes within the face ROI using Haar cascade and return up to two eyes sorted by x."""
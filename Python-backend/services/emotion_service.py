@@ -1,10 +1,12 @@
 import cv2
 import numpy as np
-import base64
 import logging
 from typing import Dict, List, Optional
 import asyncio
 from datetime import datetime
+from core.clock import iso_now
+from core.settings import settings
+from core.frames import Frame, decode_frame
 import os
 
 # Import TensorFlow conditionally to avoid import errors
@@ -35,7 +37,10 @@ class EmotionAnalysisService:
         self.emotion_labels = ['angry', 'disgust', 'fear', 'happy', 'neutral', 'sad', 'surprise']
         self.frame_buffer = []
         self.buffer_size = 10
-        self.confidence_threshold = float(os.getenv('MODEL_CONFIDENCE_THRESHOLD', 0.7))
+        self.confidence_threshold = settings.model_confidence_threshold
+        self.smoothing_window = settings.emotion_smoothing_window
+        # Gamma lookup table for face preprocessing, built once (None = no-op)
+        self.gamma_table = self._build_gamma_table(settings.emotion_preproc_gamma)
         
         # Initialize models
         self._load_models()
@@ -48,7 +53,7 @@ class EmotionAnalysisService:
             self.face_cascade = cv2.CascadeClassifier(cascade_path)
             
             # Check if custom emotion model exists, otherwise use a simple model
-            model_path = os.getenv('EMOTION_MODEL_PATH', 'models/emotion_detection_model.h5')
+            model_path = settings.emotion_model_path
             if os.path.exists(model_path):
                 self.model = load_model(model_path)
                 logger.info("✅ Custom emotion detection model loaded")
@@ -85,27 +90,17 @@ class EmotionAnalysisService:
         
         return model
     
-    def _decode_frame(self, frame_data: str) -> Optional[np.ndarray]:
-        """Decode base64 frame data to OpenCV image"""
-        try:
-            # Remove data URL prefix if present
-            if ',' in frame_data:
-                frame_data = frame_data.split(',')[1]
-            
-            # Decode base64
-            frame_bytes = base64.b64decode(frame_data)
-            
-            # Convert to numpy array
-            nparr = np.frombuffer(frame_bytes, np.uint8)
-            
-            # Decode image
-            frame = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
-            
-            return frame
-            
-        except Exception as e:
-            logger.error(f"Failed to decode frame: {e}")
+    @staticmethod
+    def _build_gamma_table(gamma: float) -> Optional[np.ndarray]:
+        """uint8 lookup table for gamma correction, or None when gamma is ~1"""
+        if not gamma or abs(gamma - 1.0) <= 1e-3:
             return None
+        inv_gamma = 1.0 / max(0.1, gamma)
+        return np.array([((i / 255.0) ** inv_gamma) * 255 for i in np.arange(0, 256)]).astype('uint8')
+    
+    def _decode_frame(self, frame_data: Frame) -> Optional[np.ndarray]:
+        """Decode base64 frame data to OpenCV image; decoded arrays pass through"""
+        return decode_frame(frame_data)
     
     def _detect_faces(self, frame: np.ndarray) -> List[tuple]:
         """Detect faces in the frame"""
@@ -138,11 +133,8 @@ class EmotionAnalysisService:
             
             # Gamma correction for illumination normalization
             try:
-                gamma = float(os.getenv('EMOTION_PREPROC_GAMMA', '1.0'))
-                if gamma and abs(gamma - 1.0) > 1e-3:
-                    inv_gamma = 1.0 / max(0.1, gamma)
-                    table = np.array([((i / 255.0) ** inv_gamma) * 255 for i in np.arange(0, 256)]).astype('uint8')
-                    gray_face = cv2.LUT(gray_face, table)
+                if self.gamma_table is not None:
+                    gray_face = cv2.LUT(gray_face, self.gamma_table)
             except Exception:
                 pass
             
@@ -163,103 +155,149 @@ class EmotionAnalysisService:
     
     def _predict_emotion(self, processed_face: np.ndarray) -> Dict[str, float]:
         """Predict emotion from processed face"""
+        return self._predict_emotions(processed_face)[0]
+    
+    def _predict_emotions(self, processed_faces: np.ndarray) -> List[Dict[str, float]]:
+        """Predict emotions for a stacked batch of processed faces in one model call"""
         try:
-            # Get prediction
-            predictions = self.model.predict(processed_face, verbose=0)
+            # Get predictions
+            predictions = self.model.predict(processed_faces, verbose=0)
             
-            # Convert to emotion probabilities
-            emotion_probs = {}
-            for i, emotion in enumerate(self.emotion_labels):
-                emotion_probs[emotion] = float(predictions[0][i])
-            
-            return emotion_probs
+            # Convert each row to emotion probabilities
+            return [
+                {emotion: float(row[i]) for i, emotion in enumerate(self.emotion_labels)}
+                for row in predictions
+            ]
             
         except Exception as e:
             logger.error(f"Emotion prediction failed: {e}")
-            return {emotion: 0.0 for emotion in self.emotion_labels}
+            return [{emotion: 0.0 for emotion in self.emotion_labels} for _ in range(len(processed_faces))]
+    
+    def _locate_face(self, frame_data: Frame):
+        """Decode a frame and preprocess its largest face.
+        
+        Returns (early_result, faces, box, processed_face). early_result is
+        set when there is nothing to run through the model.
+        """
+        # Decode frame
+        frame = self._decode_frame(frame_data)
+        if frame is None:
+            return {"error": "Failed to decode frame"}, None, None, None
+        
+        # Detect faces
+        faces = self._detect_faces(frame)
+        
+        if len(faces) == 0:
+            return {
+                "faces_detected": 0,
+                "primary_emotion": "neutral",
+                "emotion_confidence": 0.0,
+                "emotion_probabilities": {emotion: 0.0 for emotion in self.emotion_labels},
+                "timestamp": iso_now()
+            }, None, None, None
+        
+        # Process largest face
+        (x, y, w, h) = max(faces, key=lambda face: face[2] * face[3])
+        face_roi = frame[y:y+h, x:x+w]
+        
+        # Preprocess face
+        processed_face = self._preprocess_face(face_roi)
+        if processed_face is None:
+            return {"error": "Failed to preprocess face"}, None, None, None
+        
+        return None, faces, (x, y, w, h), processed_face
+    
+    def _build_result(self, faces, box, emotion_probs: Dict[str, float]) -> Dict:
+        """Smooth, gate and package the model output for one frame"""
+        (x, y, w, h) = box
+        
+        # Temporal smoothing of probabilities (simple moving average over recent frames)
+        try:
+            smoothing_window = self.smoothing_window
+            # Store the raw probs in frame buffer
+            self.frame_buffer.append({
+                "probs": emotion_probs,
+                "timestamp": datetime.now()
+            })
+            if len(self.frame_buffer) > max(self.buffer_size, smoothing_window):
+                self.frame_buffer.pop(0)
+            # Compute smoothed probs over last N entries
+            recent = [f["probs"] for f in self.frame_buffer[-smoothing_window:]] if smoothing_window > 1 else [emotion_probs]
+            smoothed = {k: float(np.mean([r.get(k, 0.0) for r in recent])) for k in self.emotion_labels}
+        except Exception:
+            smoothed = emotion_probs
+        
+        # Get primary emotions
+        primary_emotion = max(emotion_probs, key=emotion_probs.get)
+        confidence = float(emotion_probs[primary_emotion])
+        smoothed_primary = max(smoothed, key=smoothed.get)
+        smoothed_confidence = float(smoothed[smoothed_primary])
+        
+        # Confidence gating (fallback to neutral if below threshold)
+        conf_thr = self.confidence_threshold
+        gated_primary = primary_emotion if confidence >= conf_thr else 'neutral'
+        gated_smoothed_primary = smoothed_primary if smoothed_confidence >= conf_thr else 'neutral'
+        
+        # Keep buffer size limited
+        if len(self.frame_buffer) > self.buffer_size:
+            self.frame_buffer.pop(0)
+        
+        return {
+            "faces_detected": len(faces),
+            "primary_emotion": gated_primary,
+            "emotion_confidence": confidence,
+            "emotion_probabilities": emotion_probs,
+            "smoothed_primary_emotion": gated_smoothed_primary,
+            "smoothed_emotion_confidence": smoothed_confidence,
+            "smoothed_emotion_probabilities": smoothed,
+            "face_coordinates": {"x": int(x), "y": int(y), "width": int(w), "height": int(h)},
+            "timestamp": iso_now()
+        }
     
-    async def analyze_frame(self, frame_data: str) -> Dict:
+    async def analyze_frame(self, frame_data: Frame) -> Dict:
         """Analyze a single frame for emotions"""
         try:
-            # Decode frame
-            frame = self._decode_frame(frame_data)
-            if frame is None:
-                return {"error": "Failed to decode frame"}
-            
-            # Detect faces
-            faces = self._detect_faces(frame)
-            
-            if len(faces) == 0:
-                return {
-                    "faces_detected": 0,
-                    "primary_emotion": "neutral",
-                    "emotion_confidence": 0.0,
-                    "emotion_probabilities": {emotion: 0.0 for emotion in self.emotion_labels},
-                    "timestamp": datetime.now().isoformat()
-                }
-            
-            # Process largest face
-            (x, y, w, h) = max(faces, key=lambda face: face[2] * face[3])
-            face_roi = frame[y:y+h, x:x+w]
-            
-            # Preprocess face
-            processed_face = self._preprocess_face(face_roi)
-            if processed_face is None:
-                return {"error": "Failed to preprocess face"}
+            early_result, faces, box, processed_face = self._locate_face(frame_data)
+            if early_result is not None:
+                return early_result
             
             # Predict emotion
             emotion_probs = self._predict_emotion(processed_face)
             
-            # Temporal smoothing of probabilities (simple moving average over recent frames)
-            try:
-                smoothing_window = int(os.getenv('EMOTION_SMOOTHING_WINDOW', '5'))
-                # Store the raw probs in frame buffer
-                self.frame_buffer.append({
-                    "probs": emotion_probs,
-                    "timestamp": datetime.now()
-                })
-                if len(self.frame_buffer) > max(self.buffer_size, smoothing_window):
-                    self.frame_buffer.pop(0)
-                # Compute smoothed probs over last N entries
-                recent = [f["probs"] for f in self.frame_buffer[-smoothing_window:]] if smoothing_window > 1 else [emotion_probs]
-                smoothed = {k: float(np.mean([r.get(k, 0.0) for r in recent])) for k in self.emotion_labels}
-            except Exception:
-                smoothed = emotion_probs
-            
-            # Get primary emotions
-            primary_emotion = max(emotion_probs, key=emotion_probs.get)
-            confidence = float(emotion_probs[primary_emotion])
-            smoothed_primary = max(smoothed, key=smoothed.get)
-            smoothed_confidence = float(smoothed[smoothed_primary])
-            
-            # Confidence gating (fallback to neutral if below threshold)
-            try:
-                conf_thr = float(os.getenv('MODEL_CONFIDENCE_THRESHOLD', '0.7'))
-            except Exception:
-                conf_thr = 0.7
-            gated_primary = primary_emotion if confidence >= conf_thr else 'neutral'
-            gated_smoothed_primary = smoothed_primary if smoothed_confidence >= conf_thr else 'neutral'
-            
-            # Keep buffer size limited
-            if len(self.frame_buffer) > self.buffer_size:
-                self.frame_buffer.pop(0)
-            
-            return {
-                "faces_detected": len(faces),
-                "primary_emotion": gated_primary,
-                "emotion_confidence": confidence,
-                "emotion_probabilities": emotion_probs,
-                "smoothed_primary_emotion": gated_smoothed_primary,
-                "smoothed_emotion_confidence": smoothed_confidence,
-                "smoothed_emotion_probabilities": smoothed,
-                "face_coordinates": {"x": int(x), "y": int(y), "width": int(w), "height": int(h)},
-                "timestamp": datetime.now().isoformat()
-            }
+            return self._build_result(faces, box, emotion_probs)
             
         except Exception as e:
             logger.error(f"Frame analysis failed: {e}")
             return {"error": str(e)}
     
+    async def analyze_frames_batch(self, frames: List[str]) -> List[Dict]:
+        """Analyze several frames, running every detected face through one model call"""
+        results: List[Optional[Dict]] = [None] * len(frames)
+        pending = []
+        
+        for i, frame_data in enumerate(frames):
+            try:
+                early_result, faces, box, processed_face = self._locate_face(frame_data)
+            except Exception as e:
+                logger.error(f"Frame analysis failed: {e}")
+                results[i] = {"error": str(e)}
+                continue
+            if early_result is not None:
+                results[i] = early_result
+            else:
+                pending.append((i, faces, box, processed_face))
+        
+        if pending:
+            batch_probs = self._predict_emotions(np.vstack([p[3] for p in pending]))
+            for (i, faces, box, _), emotion_probs in zip(pending, batch_probs):
+                try:
+                    results[i] = self._build_result(faces, box, emotion_probs)
+                except Exception as e:
+                    logger.error(f"Frame analysis failed: {e}")
+                    results[i] = {"error": str(e)}
+        
+        return results
+    
     def get_emotion_trends(self, time_window_minutes: int = 5) -> Dict:
         """Get emotion trends over time window"""
         try:
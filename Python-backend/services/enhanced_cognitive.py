@@ -23,7 +23,10 @@ Features:
 - Performance metrics and quality assessment
 """
 from typing import Optional, Dict, Any, List, Tuple
-import base64
+try:
+    import pybase64 as base64  # SIMD-accelerated drop-in for stdlib base64
+except ImportError:
+    import base64
 import logging
 import io
 import numpy as np
@@ -208,7 +211,7 @@ def _decode_frame_dataurl(dataurl: str) -> Optional[np.ndarray]:
         print(f"🔍 [DECODE] Base64 data length: {len(data)}")
         print(f"🔍 [DECODE] Base64 data starts with: {data[:50]}...")
 
-        b = base64.b64decode(data)
+        b = base64.b64decode(data, validate=False)
         print(f"🔍 [DECODE] Decoded bytes length: {len(b)}")
 
         arr = np.frombuffer(b, dtype=np.uint8)
@@ -263,6 +266,13 @@ def _calculate_angle(p1: Tuple[float, float], p2: Tuple[float, float], p3: Tuple
     cos_angle = max(-1, min(1, cos_angle))  # Clamp to avoid domain errors
     return math.degrees(math.acos(cos_angle))
 
+def _pvariance(values: List[float]) -> float:
+    """Population variance of a handful of readings (same as np.var), without
+    the array allocation and ufunc dispatch that dominate at this size"""
+    n = len(values)
+    mean = sum(values) / n
+    return sum((v - mean) * (v - mean) for v in values) / n
+
 def _extract_facial_features(landmarks, img_shape: Tuple[int, int]) -> FacialFeatures:
     """Extract comprehensive facial features from MediaPipe landmarks"""
     features = FacialFeatures()
@@ -443,8 +453,8 @@ def _calculate_cognitive_load(features: FacialFeatures, temporal: TemporalMetric
     # Head movement (more movement = higher load)
     if len(temporal.head_pose_history) > 5:
         recent_poses = list(temporal.head_pose_history)[-5:]
-        yaw_variance = np.var([yaw for _, _, yaw, _ in recent_poses])
-        pitch_variance = np.var([pitch for _, pitch, _, _ in recent_poses])
+        yaw_variance = _pvariance([yaw for _, _, yaw, _ in recent_poses])
+        pitch_variance = _pvariance([pitch for _, pitch, _, _ in recent_poses])
         movement = (yaw_variance + pitch_variance) / 2.0
         load_factors.append(min(1.0, movement * 10))
 
@@ -516,7 +526,7 @@ def _calculate_attention_score(features: FacialFeatures, temporal: TemporalMetri
     # Head pose stability
     if len(temporal.head_pose_history) > 3:
         recent_yaw = [yaw for _, _, yaw, _ in list(temporal.head_pose_history)[-3:]]
-        yaw_stability = 1.0 - min(1.0, np.std(recent_yaw) * 5)
+        yaw_stability = 1.0 - min(1.0, math.sqrt(_pvariance(recent_yaw)) * 5)
         attention_factors.append(yaw_stability)
 
     # Average attention factors
@@ -3,6 +3,8 @@ import numpy as np
 import logging
 from typing import Dict, List, Optional
 from datetime import datetime, timedelta
+from core.clock import iso_now
+from core.frames import Frame, decode_frame
 import os
 
 logger = logging.getLogger(__name__)
@@ -20,7 +22,7 @@ class FatigueDetectionService:
         self.yawn_detection_enabled = True
         self.micro_sleep_threshold = 2.0  # seconds
         
-    async def detect_fatigue(self, frame_data: str) -> Dict:
+    async def detect_fatigue(self, frame_data: Frame) -> Dict:
         """Detect fatigue from camera frame"""
         try:
             frame = self._decode_frame(frame_data)
@@ -70,30 +72,16 @@ class FatigueDetectionService:
                 "indicators": fatigue_record["indicators"],
                 "recommendations": recommendations,
                 "break_suggested": fatigue_score > 70,
-                "timestamp": datetime.now().isoformat()
+                "timestamp": iso_now()
             }
             
         except Exception as e:
             logger.error(f"Fatigue detection failed: {e}")
             return {"error": str(e)}
     
-    def _decode_frame(self, frame_data: str) -> Optional[np.ndarray]:
-        """Decode base64 frame data"""
-        try:
-            import base64
-            
-            if ',' in frame_data:
-                frame_data = frame_data.split(',')[1]
-            
-            frame_bytes = base64.b64decode(frame_data)
-            nparr = np.frombuffer(frame_bytes, np.uint8)
-            frame = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
-            
-            return frame
-            
-        except Exception as e:
-            logger.error(f"Failed to decode frame: {e}")
-            return None
+    def _decode_frame(self, frame_data: Frame) -> Optional[np.ndarray]:
+        """Decode base64 frame data; decoded arrays pass through"""
+        return decode_frame(frame_data)
     
     def _analyze_eye_closure(self, frame: np.ndarray) -> float:
         """Analyze eye closure duration and frequency"""
@@ -10,7 +10,10 @@ This service provides sophisticated gaze tracking using:
 - Multi-resolution gaze mapping
 """
 from typing import Optional, Dict, Any, List, Tuple
-import base64
+try:
+    import pybase64 as base64  # SIMD-accelerated drop-in for stdlib base64
+except ImportError:
+    import base64
 import logging
 import numpy as np
 import cv2
@@ -259,7 +262,7 @@ class GazeTracker:
             # Decode frame
             if frame_data.startswith('data:'):
                 frame_data = frame_data.split(',', 1)[1]
-            frame_bytes = base64.b64decode(frame_data)
+            frame_bytes = base64.b64decode(frame_data, validate=False)
             nparr = np.frombuffer(frame_bytes, np.uint8)
             frame = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
 
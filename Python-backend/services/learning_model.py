@@ -92,6 +92,14 @@ class LearningModel:
         features: sparse mapping of feature-name -> value
         returns: float prediction
         """
+        return self.predict_batch([features])[0]
+
+    def predict_batch(self, rows: List[Dict]) -> List[float]:
+        """Predict one score per feature mapping with a single estimator call.
+
+        Each row is validated as in predict(); the rows are stacked into one
+        input matrix so per-call sklearn overhead is paid once per batch.
+        """
         if not self.model or not self.columns:
             raise RuntimeError("Model not available")
 
@@ -105,17 +113,17 @@ class LearningModel:
         # different model (e.g., we sent performance->score whereas pipeline
         # expects student attributes). In that case fail fast so callers can
         # fallback to heuristics.
-        provided_keys = set(features.keys())
-        overlap = sum(1 for c in expected if c in provided_keys)
         # require at least 25% of expected columns to be present, or at least 1
         min_required = max(1, len(expected) // 4)
-        if overlap < min_required:
-            raise RuntimeError(f"Input features incompatible with model: expected {len(expected)} columns, got {len(provided_keys)} keys, overlap={overlap}")
+        expected_set = frozenset(expected)
+        for features in rows:
+            overlap = len(expected_set & features.keys())
+            if overlap < min_required:
+                raise RuntimeError(f"Input features incompatible with model: expected {len(expected)} columns, got {len(features)} keys, overlap={overlap}")
 
         try:
-            # Build input row using expected column order
-            row = [features.get(c, 0.0) for c in expected]
-            X_in = [row]
+            # Build input rows using expected column order
+            X_in = [[features.get(c, 0.0) for c in expected] for features in rows]
 
             # Try predict directly; if it fails try DataFrame with named columns
             try:
@@ -129,7 +137,7 @@ class LearningModel:
                 except Exception as e2:
                     raise RuntimeError(e2)
 
-            return float(pred[0])
+            return [float(p) for p in pred]
         except Exception as e:
             raise RuntimeError(f"Model prediction failed: {e}")
 
@@ -20,12 +20,6 @@ from datetime import datetime, timedelta
 
 logger = logging.getLogger(__name__)
 
-try:
-    import numpy as np
-    _HAS_NUMPY = True
-except Exception:
-    _HAS_NUMPY = False
-
 class PerformanceMetricsService:
     """Advanced performance metrics tracking and analysis"""
 
@@ -283,18 +277,13 @@ class PerformanceMetricsService:
             if len(performance_scores) < 5:
                 return {'trend': 'insufficient_data', 'slope': 0.0}
 
-            # Calculate trend using simple linear regression
-            if _HAS_NUMPY:
-                x = np.array(timestamps)
-                y = np.array(performance_scores)
-                slope = np.polyfit(x, y, 1)[0]
-            else:
-                # Manual calculation
-                x_mean = sum(timestamps) / len(timestamps)
-                y_mean = sum(performance_scores) / len(performance_scores)
-                numerator = sum((x - x_mean) * (y - y_mean) for x, y in zip(timestamps, performance_scores))
-                denominator = sum((x - x_mean) ** 2 for x in timestamps)
-                slope = numerator / denominator if denominator != 0 else 0
+            # Least-squares slope in closed form; centring on the means keeps
+            # it accurate for epoch-second timestamps
+            x_mean = sum(timestamps) / len(timestamps)
+            y_mean = sum(performance_scores) / len(performance_scores)
+            numerator = sum((x - x_mean) * (y - y_mean) for x, y in zip(timestamps, performance_scores))
+            denominator = sum((x - x_mean) ** 2 for x in timestamps)
+            slope = numerator / denominator if denominator != 0 else 0
 
             # Determine trend
             if slope > 0.001:
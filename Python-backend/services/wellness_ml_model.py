@@ -4,8 +4,10 @@ import joblib
 import pickle
 import os
 import logging
+import threading
 from typing import Dict, List, Optional, Tuple, Any
 from datetime import datetime, timedelta
+from core.clock import iso_now
 from sklearn.ensemble import RandomForestRegressor, GradientBoostingRegressor
 from sklearn.preprocessing import StandardScaler, MinMaxScaler
 from sklearn.model_selection import train_test_split
@@ -44,6 +46,12 @@ class WellnessMLModel:
         # Feature names for model interpretability
         self.feature_names = []
         
+        # Retraining runs on its own thread: _model_lock guards swapping the
+        # (scaler, predictor) pair that predictions read, _retrain_lock keeps
+        # one retrain at a time
+        self._model_lock = threading.Lock()
+        self._retrain_lock = threading.Lock()
+        
         # Data storage for training
         self.training_data = []
         self.user_profiles = {}
@@ -345,7 +353,7 @@ class WellnessMLModel:
                 'user_context': convert_numpy_types(user_context),
                 'recommendations': self._generate_recommendations(features, prediction['score']),
                 'trends': self._analyze_trends(user_id),
-                'timestamp': datetime.now().isoformat()
+                'timestamp': iso_now()
             }
             
             return result
@@ -357,7 +365,7 @@ class WellnessMLModel:
                 'confidence': 0.0,
                 'model_type': 'fallback',
                 'error': str(e),
-                'timestamp': datetime.now().isoformat()
+                'timestamp': iso_now()
             }
     
     def _get_user_context(self, user_id: str) -> Dict:
@@ -416,16 +424,25 @@ class WellnessMLModel:
     def _ml_predict(self, features: np.ndarray) -> Dict:
         """Make prediction using trained ML model with calibrated uncertainty and explanation."""
         try:
-            # Scale features
-            scaled_features = self.scaler.transform(features)
+            # One consistent scaler/predictor pair even if a retrain swaps them
+            with self._model_lock:
+                scaler, predictor = self.scaler, self.wellness_predictor
 
-            # Primary prediction (point estimate)
-            point_pred = float(self.wellness_predictor.predict(scaled_features)[0])
+            # Scale features
+            scaled_features = scaler.transform(features)
 
             # Try ensemble-based uncertainty if available
-            if hasattr(self.wellness_predictor, 'estimators_') and len(self.wellness_predictor.estimators_) > 1:
+            if hasattr(predictor, 'estimators_') and len(predictor.estimators_) > 1:
                 try:
-                    preds = np.array([est.predict(scaled_features)[0] for est in self.wellness_predictor.estimators_])
+                    # Validate/convert once, then skip each tree's own input checks
+                    # (what the forest does internally); the mean is the forest's
+                    # prediction, so no separate forest-level predict is needed
+                    tree_input = np.ascontiguousarray(scaled_features, dtype=np.float32)
+                    preds = np.fromiter(
+                        (est.predict(tree_input, check_input=False)[0] for est in predictor.estimators_),
+                        dtype=float,
+                        count=len(predictor.estimators_)
+                    )
                     mean_pred = float(np.mean(preds))
                     std_pred = float(np.std(preds))
 
@@ -442,12 +459,7 @@ class WellnessMLModel:
                     }
 
                     # Feature importance
-                    feature_importance = {}
-                    if hasattr(self.wellness_predictor, 'feature_importances_'):
-                        importance_scores = self.wellness_predictor.feature_importances_
-                        for i, score in enumerate(importance_scores):
-                            if i < len(self.feature_names):
-                                feature_importance[self.feature_names[i]] = float(score)
+                    feature_importance = self._feature_importance(predictor)
 
                     return {
                         'score': float(mean_pred),
@@ -459,18 +471,16 @@ class WellnessMLModel:
                 except Exception as e:
                     logger.warning(f"Ensemble variance estimate failed: {e}")
 
+            # Primary prediction (point estimate) for the non-ensemble fallbacks
+            point_pred = float(predictor.predict(scaled_features)[0])
+
             # Fallback: if predict_proba exists use it (classification-derived confidence)
-            if hasattr(self.wellness_predictor, 'predict_proba'):
+            if hasattr(predictor, 'predict_proba'):
                 try:
-                    probs = self.wellness_predictor.predict_proba(scaled_features)
+                    probs = predictor.predict_proba(scaled_features)
                     top_prob = float(np.max(probs[0]))
                     confidence_explanation = {'method': 'predict_proba', 'top_prob': top_prob}
-                    feature_importance = {}
-                    if hasattr(self.wellness_predictor, 'feature_importances_'):
-                        importance_scores = self.wellness_predictor.feature_importances_
-                        for i, score in enumerate(importance_scores):
-                            if i < len(self.feature_names):
-                                feature_importance[self.feature_names[i]] = float(score)
+                    feature_importance = self._feature_importance(predictor)
 
                     return {
                         'score': point_pred,
@@ -495,6 +505,13 @@ class WellnessMLModel:
             logger.error(f"ML prediction failed: {e}")
             return self._rule_based_predict(features.flatten())
     
+    def _feature_importance(self, predictor) -> Dict[str, float]:
+        """Map the model's feature importances onto the known feature names"""
+        if not hasattr(predictor, 'feature_importances_'):
+            return {}
+        # zip stops at the shorter of the two, as the old index check did
+        return dict(zip(self.feature_names or [], predictor.feature_importances_.tolist()))
+    
     def _rule_based_predict(self, features: np.ndarray) -> Dict:
         """Fallback to rule-based prediction with confidence explanation"""
         try:
@@ -619,19 +636,28 @@ class WellnessMLModel:
         }
     
     def _retrain_model(self):
-        """Retrain the ML model with accumulated data"""
+        """Retrain the ML model with accumulated data.
+
+        Safe to call from any thread. If another retrain is already running
+        this returns at once; the samples stay queued for the next one.
+        """
+        if not self._retrain_lock.acquire(blocking=False):
+            logger.info("Model retraining already in progress")
+            return
         try:
-            if len(self.training_data) < 10:
+            # Train on a snapshot; samples added meanwhile are kept for next time
+            training_data = list(self.training_data)
+            if len(training_data) < 10:
                 logger.info("Insufficient data for training")
                 return
             
-            logger.info(f"🔄 Retraining model with {len(self.training_data)} data points")
+            logger.info(f"🔄 Retraining model with {len(training_data)} data points")
             
             # Prepare training data
             X = []
             y = []
             
-            for data_point in self.training_data:
+            for data_point in training_data:
                 features = list(data_point['processed_features'].values())
                 # Filter out non-numeric values
                 numeric_features = [f for f in features if isinstance(f, (int, float)) and not np.isnan(f)]
@@ -650,36 +676,43 @@ class WellnessMLModel:
             # Split data
             X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
             
-            # Scale features
-            self.scaler.fit(X_train)
-            X_train_scaled = self.scaler.transform(X_train)
-            X_test_scaled = self.scaler.transform(X_test)
+            # Fit a fresh scaler and model; predictions keep using the current
+            # pair until both are swapped in below
+            scaler = StandardScaler()
+            scaler.fit(X_train)
+            X_train_scaled = scaler.transform(X_train)
+            X_test_scaled = scaler.transform(X_test)
             
             # Train ensemble model
-            self.wellness_predictor = RandomForestRegressor(
+            predictor = RandomForestRegressor(
                 n_estimators=100,
                 max_depth=10,
                 random_state=42,
                 n_jobs=-1
             )
             
-            self.wellness_predictor.fit(X_train_scaled, y_train)
+            predictor.fit(X_train_scaled, y_train)
             
             # Evaluate model
-            y_pred = self.wellness_predictor.predict(X_test_scaled)
+            y_pred = predictor.predict(X_test_scaled)
             mse = mean_squared_error(y_test, y_pred)
             r2 = r2_score(y_test, y_pred)
             
             logger.info(f"✅ Model retrained - MSE: {mse:.2f}, R²: {r2:.2f}")
             
+            with self._model_lock:
+                self.scaler, self.wellness_predictor = scaler, predictor
+            
             # Save model
             self._save_model()
             
-            # Clear training data to prevent memory issues
-            self.training_data = []
+            # Drop the samples that were trained on to prevent memory issues
+            del self.training_data[:len(training_data)]
             
         except Exception as e:
             logger.error(f"❌ Model retraining failed: {e}")
+        finally:
+            self._retrain_lock.release()
     
     def get_model_info(self) -> Dict:
         """Get information about the current model"""
@@ -1,12 +1,151 @@
 import logging
+from collections import deque
 from typing import Dict, List, Optional
 from datetime import datetime, timedelta
+from core.clock import iso_now
 import numpy as np
 import json
 from services.wellness_ml_model import wellness_ml_model
 
 logger = logging.getLogger(__name__)
 
+# Break activity templates per need, shared by every suggest_break_activities
+# call; responses only serialize them
+_BREAK_ACTIVITIES: Dict[str, tuple] = {
+    "stress": (
+        {
+            "type": "breathing_exercise",
+            "title": "Deep Breathing",
+            "description": "4-7-8 breathing technique for stress relief",
+            "duration": 5,
+            "effectiveness": "high"
+        },
+        {
+            "type": "meditation",
+            "title": "Quick Meditation",
+            "description": "5-minute mindfulness meditation",
+            "duration": 5,
+            "effectiveness": "high"
+        },
+    ),
+    "energy": (
+        {
+            "type": "light_exercise",
+            "title": "Energizing Stretch",
+            "description": "Light stretching to boost energy",
+            "duration": 10,
+            "effectiveness": "medium"
+        },
+        {
+            "type": "hydration",
+            "title": "Hydration Break",
+            "description": "Drink water and have a healthy snack",
+            "duration": 5,
+            "effectiveness": "medium"
+        },
+    ),
+    "fatigue": (
+        {
+            "type": "power_nap",
+            "title": "Power Nap",
+            "description": "10-20 minute rest to combat fatigue",
+            "duration": 15,
+            "effectiveness": "high"
+        },
+        {
+            "type": "eye_rest",
+            "title": "Eye Rest Exercise",
+            "description": "20-20-20 rule for eye strain relief",
+            "duration": 3,
+            "effectiveness": "medium"
+        },
+    ),
+    "general": (
+        {
+            "type": "walk",
+            "title": "Short Walk",
+            "description": "5-minute walk to refresh your mind",
+            "duration": 5,
+            "effectiveness": "medium"
+        },
+        {
+            "type": "stretching",
+            "title": "Desk Stretches",
+            "description": "Simple stretches to relieve tension",
+            "duration": 3,
+            "effectiveness": "medium"
+        },
+    ),
+}
+
+# Recommendation and alert entries by type; the generators pick from these
+# instead of rebuilding the same literals on every tracking request
+_WELLNESS_RECOMMENDATIONS: Dict[str, Dict] = {
+    "mood_improvement": {
+        "type": "mood_improvement",
+        "title": "Mood Boost Activities",
+        "description": "Try a short walk, listen to uplifting music, or practice gratitude",
+        "priority": "high",
+        "estimated_time": "10-15 minutes"
+    },
+    "stress_reduction": {
+        "type": "stress_reduction",
+        "title": "Stress Relief Techniques",
+        "description": "Practice deep breathing, progressive muscle relaxation, or meditation",
+        "priority": "high",
+        "estimated_time": "5-10 minutes"
+    },
+    "energy_boost": {
+        "type": "energy_boost",
+        "title": "Energy Enhancement",
+        "description": "Take a power nap, do light exercise, or have a healthy snack",
+        "priority": "medium",
+        "estimated_time": "15-20 minutes"
+    },
+    "sleep_improvement": {
+        "type": "sleep_improvement",
+        "title": "Sleep Optimization",
+        "description": "Establish a bedtime routine and aim for 7-9 hours of sleep",
+        "priority": "medium",
+        "estimated_time": "ongoing"
+    },
+    "physical_activity": {
+        "type": "physical_activity",
+        "title": "Increase Physical Activity",
+        "description": "Add 30 minutes of moderate exercise to your daily routine",
+        "priority": "low",
+        "estimated_time": "30 minutes"
+    },
+}
+
+_WELLNESS_ALERTS: Dict[str, Dict] = {
+    "high_stress": {
+        "type": "high_stress",
+        "severity": "high",
+        "message": "High stress level detected. Consider taking a break.",
+        "action": "immediate_break"
+    },
+    "low_mood": {
+        "type": "low_mood",
+        "severity": "medium",
+        "message": "Low mood detected. Wellness support recommended.",
+        "action": "wellness_intervention"
+    },
+    "fatigue": {
+        "type": "fatigue",
+        "severity": "high",
+        "message": "High fatigue detected. Rest is recommended.",
+        "action": "extended_break"
+    },
+    "sleep_deprivation": {
+        "type": "sleep_deprivation",
+        "severity": "medium",
+        "message": "Inadequate sleep detected. Consider adjusting study intensity.",
+        "action": "reduce_intensity"
+    },
+}
+
+
 class WellnessService:
     """Service for comprehensive wellness tracking and recommendations"""
     
@@ -28,7 +167,7 @@ class WellnessService:
             
             # Initialize user wellness profile if not exists
             if user_id not in self.wellness_profiles:
-                self.wellness_profiles[user_id] = self._create_wellness_profile(user_id)
+                self.wellness_profiles[user_id] = self._create_wellness_profile(user_id, current_time)
             
             profile = self.wellness_profiles[user_id]
             
@@ -56,7 +195,7 @@ class WellnessService:
             wellness_score = ml_prediction['wellness_score']
             
             # Update profile
-            self._update_wellness_profile(profile, processed_metrics, wellness_score)
+            self._update_wellness_profile(profile, processed_metrics, wellness_score, current_time)
             
             # Generate recommendations
             recommendations = self._generate_wellness_recommendations(processed_metrics, profile)
@@ -79,18 +218,19 @@ class WellnessService:
             logger.error(f"Wellness tracking failed: {e}")
             return {"error": str(e)}
     
-    def _create_wellness_profile(self, user_id: str) -> Dict:
+    def _create_wellness_profile(self, user_id: str, now: Optional[datetime] = None) -> Dict:
         """Create initial wellness profile for user"""
+        now = now or datetime.now()
         return {
             "user_id": user_id,
             "wellness_history": [],
-            "mood_patterns": [],
+            "mood_patterns": deque(maxlen=100),  # the last 100 mood samples
             "stress_triggers": [],
             "optimal_break_intervals": 25,  # minutes
             "preferred_wellness_activities": [],
             "baseline_metrics": {},
-            "created_at": datetime.now(),
-            "last_updated": datetime.now()
+            "created_at": now,
+            "last_updated": now
         }
     
     def _process_mood_data(self, mood_data: Dict) -> Dict:
@@ -292,10 +432,10 @@ class WellnessService:
         else:
             return "low"
     
-    def _update_wellness_profile(self, profile: Dict, metrics: Dict, wellness_score: float):
-        """Update user wellness profile with new data"""
+    def _update_wellness_profile(self, profile: Dict, metrics: Dict, wellness_score: float, current_time: datetime):
+        """Update user wellness profile with new data; `current_time` is the
+        request's timestamp, shared with the rest of track_wellness_metrics"""
         try:
-            current_time = datetime.now()
             
             # Add to wellness history
             profile["wellness_history"].append({
@@ -304,12 +444,16 @@ class WellnessService:
                 "timestamp": current_time
             })
             
-            # Keep only recent history (last 30 days)
+            # Keep only recent history (last 30 days). Entries are appended in
+            # time order, so the stale ones are a prefix: trim it in place
+            # instead of rebuilding the whole list on every update
             thirty_days_ago = current_time - timedelta(days=30)
-            profile["wellness_history"] = [
-                wh for wh in profile["wellness_history"] 
-                if wh["timestamp"] > thirty_days_ago
-            ]
+            history = profile["wellness_history"]
+            stale = 0
+            while stale < len(history) and history[stale]["timestamp"] <= thirty_days_ago:
+                stale += 1
+            if stale:
+                del history[:stale]
             
             # Update mood patterns
             mood_score = metrics["mood_score"]["score"]
@@ -318,9 +462,6 @@ class WellnessService:
                 "timestamp": current_time
             })
             
-            # Keep recent mood data
-            profile["mood_patterns"] = profile["mood_patterns"][-100:]
-            
             profile["last_updated"] = current_time
             
         except Exception as e:
@@ -334,55 +475,25 @@ class WellnessService:
             # Mood-based recommendations
             mood_score = metrics["mood_score"]["score"]
             if mood_score <= 4:
-                recommendations.append({
-                    "type": "mood_improvement",
-                    "title": "Mood Boost Activities",
-                    "description": "Try a short walk, listen to uplifting music, or practice gratitude",
-                    "priority": "high",
-                    "estimated_time": "10-15 minutes"
-                })
+                recommendations.append(_WELLNESS_RECOMMENDATIONS["mood_improvement"])
             
             # Stress-based recommendations
             stress_level = metrics["stress_level"]["level"]
             if stress_level >= 7:
-                recommendations.append({
-                    "type": "stress_reduction",
-                    "title": "Stress Relief Techniques",
-                    "description": "Practice deep breathing, progressive muscle relaxation, or meditation",
-                    "priority": "high",
-                    "estimated_time": "5-10 minutes"
-                })
+                recommendations.append(_WELLNESS_RECOMMENDATIONS["stress_reduction"])
             
             # Energy-based recommendations
             energy_level = metrics["energy_level"]["level"]
             if energy_level <= 4:
-                recommendations.append({
-                    "type": "energy_boost",
-                    "title": "Energy Enhancement",
-                    "description": "Take a power nap, do light exercise, or have a healthy snack",
-                    "priority": "medium",
-                    "estimated_time": "15-20 minutes"
-                })
+                recommendations.append(_WELLNESS_RECOMMENDATIONS["energy_boost"])
             
             # Sleep-based recommendations
             if not metrics["sleep_quality"]["adequate"]:
-                recommendations.append({
-                    "type": "sleep_improvement",
-                    "title": "Sleep Optimization",
-                    "description": "Establish a bedtime routine and aim for 7-9 hours of sleep",
-                    "priority": "medium",
-                    "estimated_time": "ongoing"
-                })
+                recommendations.append(_WELLNESS_RECOMMENDATIONS["sleep_improvement"])
             
             # Activity-based recommendations
             if not metrics["physical_activity"]["sufficient"]:
-                recommendations.append({
-                    "type": "physical_activity",
-                    "title": "Increase Physical Activity",
-                    "description": "Add 30 minutes of moderate exercise to your daily routine",
-                    "priority": "low",
-                    "estimated_time": "30 minutes"
-                })
+                recommendations.append(_WELLNESS_RECOMMENDATIONS["physical_activity"])
             
             return recommendations
             
@@ -397,39 +508,19 @@ class WellnessService:
         try:
             # High stress alert
             if metrics["stress_level"]["level"] >= 8:
-                alerts.append({
-                    "type": "high_stress",
-                    "severity": "high",
-                    "message": "High stress level detected. Consider taking a break.",
-                    "action": "immediate_break"
-                })
+                alerts.append(_WELLNESS_ALERTS["high_stress"])
             
             # Low mood alert
             if metrics["mood_score"]["score"] <= 3:
-                alerts.append({
-                    "type": "low_mood",
-                    "severity": "medium",
-                    "message": "Low mood detected. Wellness support recommended.",
-                    "action": "wellness_intervention"
-                })
+                alerts.append(_WELLNESS_ALERTS["low_mood"])
             
             # Fatigue alert
             if metrics.get("fatigue_score", 0) >= 70:
-                alerts.append({
-                    "type": "fatigue",
-                    "severity": "high",
-                    "message": "High fatigue detected. Rest is recommended.",
-                    "action": "extended_break"
-                })
+                alerts.append(_WELLNESS_ALERTS["fatigue"])
             
             # Sleep deprivation alert
             if not metrics["sleep_quality"]["adequate"]:
-                alerts.append({
-                    "type": "sleep_deprivation",
-                    "severity": "medium",
-                    "message": "Inadequate sleep detected. Consider adjusting study intensity.",
-                    "action": "reduce_intensity"
-                })
+                alerts.append(_WELLNESS_ALERTS["sleep_deprivation"])
             
             return alerts
             
@@ -505,83 +596,23 @@ class WellnessService:
             activities = []
             
             if stress_level >= 7:
-                activities.extend([
-                    {
-                        "type": "breathing_exercise",
-                        "title": "Deep Breathing",
-                        "description": "4-7-8 breathing technique for stress relief",
-                        "duration": 5,
-                        "effectiveness": "high"
-                    },
-                    {
-                        "type": "meditation",
-                        "title": "Quick Meditation",
-                        "description": "5-minute mindfulness meditation",
-                        "duration": 5,
-                        "effectiveness": "high"
-                    }
-                ])
+                activities.extend(_BREAK_ACTIVITIES["stress"])
             
             if energy_level <= 4:
-                activities.extend([
-                    {
-                        "type": "light_exercise",
-                        "title": "Energizing Stretch",
-                        "description": "Light stretching to boost energy",
-                        "duration": 10,
-                        "effectiveness": "medium"
-                    },
-                    {
-                        "type": "hydration",
-                        "title": "Hydration Break",
-                        "description": "Drink water and have a healthy snack",
-                        "duration": 5,
-                        "effectiveness": "medium"
-                    }
-                ])
+                activities.extend(_BREAK_ACTIVITIES["energy"])
             
             if fatigue_level >= 70:
-                activities.extend([
-                    {
-                        "type": "power_nap",
-                        "title": "Power Nap",
-                        "description": "10-20 minute rest to combat fatigue",
-                        "duration": 15,
-                        "effectiveness": "high"
-                    },
-                    {
-                        "type": "eye_rest",
-                        "title": "Eye Rest Exercise",
-                        "description": "20-20-20 rule for eye strain relief",
-                        "duration": 3,
-                        "effectiveness": "medium"
-                    }
-                ])
+                activities.extend(_BREAK_ACTIVITIES["fatigue"])
             
             # Add general activities if no specific needs
             if not activities:
-                activities = [
-                    {
-                        "type": "walk",
-                        "title": "Short Walk",
-                        "description": "5-minute walk to refresh your mind",
-                        "duration": 5,
-                        "effectiveness": "medium"
-                    },
-                    {
-                        "type": "stretching",
-                        "title": "Desk Stretches",
-                        "description": "Simple stretches to relieve tension",
-                        "duration": 3,
-                        "effectiveness": "medium"
-                    }
-                ]
+                activities = list(_BREAK_ACTIVITIES["general"])
             
             return {
                 "suggested_activities": activities,
                 "break_duration_recommended": self._calculate_optimal_break_duration(current_state),
                 "urgency": self._assess_break_urgency(current_state),
-                "timestamp": datetime.now().isoformat()
+                "timestamp": iso_now()
             }
             
         except Exception as e:
@@ -662,7 +693,7 @@ class WellnessService:
                 "stress_patterns": stress_patterns,
                 "optimal_times": optimal_times,
                 "overall_wellness_trend": self._analyze_wellness_trends(profile),
-                "timestamp": datetime.now().isoformat()
+                "timestamp": iso_now()
             }
             
         except Exception as e:
@@ -709,22 +740,23 @@ class WellnessService:
         if not wellness_history:
             return {"error": "Insufficient data"}
         
-        # Group by hour and calculate average wellness
-        hourly_wellness = {}
-        
-        for entry in wellness_history:
-            hour = entry["timestamp"].hour
-            if hour not in hourly_wellness:
-                hourly_wellness[hour] = []
-            hourly_wellness[hour].append(entry["wellness_score"])
+        # Average wellness per hour of day: per-hour sums and counts in two
+        # bincount passes instead of a dict of lists
+        n = len(wellness_history)
+        hours = np.fromiter((entry["timestamp"].hour for entry in wellness_history), dtype=np.intp, count=n)
+        scores = np.fromiter((entry["wellness_score"] for entry in wellness_history), dtype=np.float64, count=n)
+        counts = np.bincount(hours, minlength=24)
+        sums = np.bincount(hours, weights=scores, minlength=24)
+        seen_hours = np.flatnonzero(counts)
+        averages = sums[seen_hours] / counts[seen_hours]
         
-        # Find peak wellness time
-        hourly_averages = {hour: np.mean(scores) for hour, scores in hourly_wellness.items()}
+        hourly_averages = {int(hour): float(avg) for hour, avg in zip(seen_hours, averages)}
         
         if not hourly_averages:
             return {"error": "No time-based data"}
         
-        peak_hour = max(hourly_averages, key=hourly_averages.get)
+        # Find peak wellness time
+        peak_hour = int(seen_hours[np.argmax(averages)])
         
         return {
             "peak_wellness_time": f"{peak_hour:02d}:00",
@@ -0,0 +1,107 @@
+"""
+Test script for the adaptive learning lookup table.
+
+adapt_content answers from _ADAPT_TABLE, indexed by a 9-bit mask of threshold
+checks. These tests compare it with the original if/elif rules: once for every
+mask, and once end to end over a grid of values on each side of every
+threshold. Runs standalone (python test_adaptive_table.py) or under pytest.
+"""
+import asyncio
+import itertools
+
+from services.adaptive_learning_service import AdaptiveLearningService, _ADAPT_TABLE
+
+# Values at and either side of each threshold the rules use
+ATTENTION_VALUES = (0, 39, 40, 41, 69, 70, 71, 79, 80, 81, 100)
+ENGAGEMENT_VALUES = (0, 39, 40, 41, 74, 75, 76, 79, 80, 81, 100)
+CONFUSION_VALUES = (0, 49, 50, 51, 59, 60, 61, 100)
+FATIGUE_VALUES = (0, 69, 70, 71, 100)
+CONTENTS = ({}, {"primary_format": "video"})
+
+
+def reference_from_flags(confused, engaged, attentive, inattentive, disengaged,
+                         very_attentive, very_engaged, fatigued, unclear, current_content):
+    """The original if/elif adaptation rules, with each comparison as a flag"""
+    adaptations = {
+        "difficulty_adjustment": None,
+        "explanation_style": "concise",
+        "interactivity_level": "medium",
+        "break_suggestion": False,
+        "pacing": "normal",
+        "primary_format": current_content.get("primary_format", "text"),
+    }
+    if confused:
+        adaptations["difficulty_adjustment"] = "decrease"
+        adaptations["explanation_style"] = "detailed"
+    elif engaged and attentive:
+        adaptations["difficulty_adjustment"] = "increase"
+    if inattentive or disengaged:
+        adaptations["interactivity_level"] = "high"
+    elif very_attentive and very_engaged:
+        adaptations["interactivity_level"] = "low"
+    if fatigued:
+        adaptations["break_suggestion"] = True
+        adaptations["pacing"] = "slower"
+    if unclear:
+        adaptations["primary_format"] = "visual"
+    elif inattentive:
+        adaptations["primary_format"] = "interactive"
+    return adaptations
+
+
+def reference(attention, engagement, confusion, fatigue, current_content):
+    """The original rules on raw 0-100 scores"""
+    return reference_from_flags(
+        confusion >= 60, engagement >= 75, attention >= 70, attention < 40, engagement < 40,
+        attention > 80, engagement > 80, fatigue > 70, confusion > 50, current_content,
+    )
+
+
+def assert_same(actual, expected, context):
+    # Key order is part of the response payload, so compare it too
+    assert actual == expected and list(actual) == list(expected), (context, actual, expected)
+
+
+def test_every_mask_matches_rules():
+    """All 512 table rows agree with the rules for the same flags"""
+    assert len(_ADAPT_TABLE) == 1 << 9
+    for mask in range(1 << 9):
+        flags = [bool(mask >> bit & 1) for bit in range(9)]
+        for content in CONTENTS:
+            adaptations = _ADAPT_TABLE[mask].copy()
+            if adaptations["primary_format"] is None:
+                adaptations["primary_format"] = content.get("primary_format", "text")
+            assert_same(adaptations, reference_from_flags(*flags, content), mask)
+
+
+def test_adapt_content_boundary_grid():
+    """adapt_content matches the rules around every threshold"""
+    async def run():
+        service = AdaptiveLearningService()
+        grid = itertools.product(ATTENTION_VALUES, ENGAGEMENT_VALUES, CONFUSION_VALUES, FATIGUE_VALUES, CONTENTS)
+        for i, (attention, engagement, confusion, fatigue, content) in enumerate(grid):
+            state = {"attention": attention, "engagement": engagement, "confusion": confusion, "fatigue": fatigue}
+            # Fresh user per case so the profile's recent attention mean is the raw value
+            result = await service.adapt_content(f"grid-{i}", state, content)
+            assert_same(result["adaptations"], reference(attention, engagement, confusion, fatigue, content), state)
+
+    asyncio.run(run())
+
+
+def main():
+    """Run every test_* function and report"""
+    tests = [obj for name, obj in sorted(globals().items()) if name.startswith("test_") and callable(obj)]
+    failed = 0
+    for test in tests:
+        try:
+            test()
+            print(f"✅ {test.__name__}")
+        except Exception as e:
+            failed += 1
+            print(f"❌ {test.__name__}: {e!r}")
+    print(f"\n{len(tests) - failed}/{len(tests)} passed")
+    return failed
+
+
+if __name__ == "__main__":
+    raise SystemExit(1 if main() else 0)
@@ -0,0 +1,136 @@
+"""
+Test script for core.batching.MicroBatcher.
+
+Checks that batched results fan back out to the right callers, that one bad
+item only fails its own caller, and that stop() releases pending submits.
+Runs standalone (python test_batching.py) or under pytest.
+"""
+import asyncio
+
+from core.batching import MicroBatcher
+
+
+class BadItem(Exception):
+    pass
+
+
+def test_results_fan_out_to_callers():
+    """Each caller gets the result for its own item, in one batched call"""
+    batches = []
+
+    async def double(items):
+        batches.append(list(items))
+        await asyncio.sleep(0)
+        return [item * 2 for item in items]
+
+    async def run():
+        batcher = MicroBatcher(double, max_batch=8, max_wait=0.05, name="test")
+        try:
+            return await asyncio.gather(*(batcher.submit(i) for i in range(5)))
+        finally:
+            await batcher.stop()
+
+    results = asyncio.run(run())
+    assert results == [0, 2, 4, 6, 8], results
+    assert batches == [[0, 1, 2, 3, 4]], batches
+
+
+def test_max_batch_splits_batches():
+    """More callers than max_batch are served by several batches"""
+    sizes = []
+
+    async def identity(items):
+        sizes.append(len(items))
+        return list(items)
+
+    async def run():
+        batcher = MicroBatcher(identity, max_batch=3, max_wait=0.05, name="test")
+        try:
+            return await asyncio.gather(*(batcher.submit(i) for i in range(7)))
+        finally:
+            await batcher.stop()
+
+    results = asyncio.run(run())
+    assert results == list(range(7)), results
+    assert max(sizes) <= 3 and sum(sizes) == 7, sizes
+
+
+def test_failing_item_only_fails_its_caller():
+    """A batch that raises is retried per item; only the bad caller sees the error"""
+    async def reject_negative(items):
+        if any(item < 0 for item in items):
+            raise BadItem("negative item")
+        return [item + 100 for item in items]
+
+    async def run():
+        batcher = MicroBatcher(reject_negative, max_batch=8, max_wait=0.05, name="test")
+        try:
+            return await asyncio.gather(
+                *(batcher.submit(i) for i in (1, -1, 2, 3)),
+                return_exceptions=True,
+            )
+        finally:
+            await batcher.stop()
+
+    results = asyncio.run(run())
+    assert results[0] == 101 and results[2] == 102 and results[3] == 103, results
+    assert isinstance(results[1], BadItem), results
+
+
+def test_stop_releases_pending_submits():
+    """stop() cancels callers whose batch is in flight or still queued"""
+    async def run():
+        started = asyncio.Event()
+        release = asyncio.Event()
+
+        async def blocked(items):
+            started.set()
+            await release.wait()
+            return list(items)
+
+        # max_batch=1: the first item is in flight, the rest wait in the queue
+        batcher = MicroBatcher(blocked, max_batch=1, max_wait=0.0, name="test")
+        tasks = [asyncio.create_task(batcher.submit(i)) for i in range(3)]
+        await started.wait()
+        await asyncio.sleep(0)
+        await batcher.stop()
+        return await asyncio.wait_for(asyncio.gather(*tasks, return_exceptions=True), 1.0)
+
+    results = asyncio.run(run())
+    assert len(results) == 3, results
+    assert all(isinstance(r, asyncio.CancelledError) for r in results), results
+
+
+def test_restarts_after_stop():
+    """A stopped batcher starts a fresh worker on the next submit"""
+    async def identity(items):
+        return list(items)
+
+    async def run():
+        batcher = MicroBatcher(identity, max_batch=4, max_wait=0.01, name="test")
+        first = await batcher.submit("a")
+        await batcher.stop()
+        second = await batcher.submit("b")
+        await batcher.stop()
+        return first, second
+
+    assert asyncio.run(run()) == ("a", "b")
+
+
+def main():
+    """Run every test_* function and report"""
+    tests = [obj for name, obj in sorted(globals().items()) if name.startswith("test_") and callable(obj)]
+    failed = 0
+    for test in tests:
+        try:
+            test()
+            print(f"✅ {test.__name__}")
+        except Exception as e:
+            failed += 1
+            print(f"❌ {test.__name__}: {e!r}")
+    print(f"\n{len(tests) - failed}/{len(tests)} passed")
+    return failed
+
+
+if __name__ == "__main__":
+    raise SystemExit(1 if main() else 0)